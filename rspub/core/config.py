@@ -18,11 +18,12 @@ The location where configurations are stored is system-dependent:
 .. seealso:: :doc:`RsParameters <rspub.core.rs_paras>`
 
 """
+import functools
+import json
 import logging
 import os
 import platform
 from configparser import ConfigParser
-from glob import glob
 
 from rspub.core.rs_enum import Strategy, SelectMode
 
@@ -30,6 +31,14 @@ CFG_FILENAME = "DEFAULT.cfg"
 CFG_DIRNAME = "core"
 SECTION_CORE = "core"
 EXT = ".cfg"
+JSON_EXT = ".json"
+
+
+@functools.lru_cache(maxsize=1)
+def _user_home():
+    # cached; _user_home.cache_clear() after changing HOME only affects _get_config_path:
+    # the fallback defaults of the getters below are bound once, when this module is imported
+    return os.path.expanduser("~")
 
 
 class Configurations(object):
@@ -56,8 +65,9 @@ class Configurations(object):
         :return: list of names of previously saved configurations
         """
         config_path = Configuration._get_config_path()
-        config_files = sorted(glob(os.path.join(config_path, "*" + EXT)))
-        return [os.path.splitext(os.path.basename(x))[0] for x in config_files]
+        with os.scandir(config_path) as it:
+            names = [e.name[:-len(EXT)] for e in it if e.name.endswith(EXT) and not e.name.startswith(".")]
+        return sorted(names)
 
     @staticmethod
     def load_configuration(name: str):
@@ -140,6 +150,8 @@ class Configuration(object):
     """
 
     _configuration_filename = CFG_FILENAME
+    _configuration_dir = None
+    _PLATFORM = platform.system()
 
     @staticmethod
     def __get__logger():
@@ -158,6 +170,12 @@ class Configuration(object):
 
         return Configuration._configuration_filename
 
+    @staticmethod
+    def _set_configuration_dir(cfg_dir):
+        # overrides the system-dependent configuration directory, f.i. with a temporary directory in tests
+        Configuration.__get__logger().debug("Setting configuration directory to %s", cfg_dir)
+        Configuration._configuration_dir = cfg_dir
+
     @staticmethod
     def reset():
         Configuration._instance = None
@@ -165,9 +183,11 @@ class Configuration(object):
 
     @staticmethod
     def _get_config_path():
+        if Configuration._configuration_dir:
+            return Configuration._configuration_dir
 
-        c_path = os.path.expanduser("~")
-        opsys = platform.system()
+        c_path = _user_home()
+        opsys = Configuration._PLATFORM
         if opsys == "Windows":
             win_path = os.path.join(c_path, "AppData", "Local")
             if os.path.exists(win_path): c_path = win_path
@@ -194,11 +214,26 @@ class Configuration(object):
             cls._instance = super(Configuration, cls).__new__(cls, *args)
             cls.config_path = cls._get_config_path()
             cls.config_file = os.path.join(cls.config_path, Configuration._get_configuration_filename())
-            cls.parser = ConfigParser()
-            if os.path.exists(cls.config_file):
-                cls.parser.read(cls.config_file, encoding="utf-8")
+            # the configuration file is read on first use of the parser
+            cls._parser = None
+            cls._parser_file = cls.config_file
+            cls._persisted = None
         return cls._instance
 
+    @property
+    def parser(self):
+        if Configuration._parser is None:
+            parser = ConfigParser()
+            if os.path.exists(Configuration._parser_file):
+                if Configuration._parser_file.endswith(JSON_EXT):
+                    with open(Configuration._parser_file, "r", encoding="utf-8") as f:
+                        parser.read_dict(json.load(f))
+                else:
+                    parser.read(Configuration._parser_file, encoding="utf-8")
+            Configuration._parser = parser
+            Configuration._persisted = (Configuration._parser_file, self._core_snapshot())
+        return Configuration._parser
+
     def config_path(self):
         return self.config_path
 
@@ -209,11 +244,31 @@ class Configuration(object):
         return os.path.splitext(os.path.basename(self.config_file))[0]
 
     def persist(self):
-        f = open(self.config_file, "w", encoding="utf-8")
-        self.parser.write(f)
-        f.close()
+        if self.is_persisted():
+            Configuration.__get__logger().debug("Nothing to persist for %s", self.config_file)
+            return
+        # write to a temporary file and rename, so that the configuration file is replaced atomically
+        tmp_file = self.config_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            if self.config_file.endswith(JSON_EXT):
+                # configuration files with extension .json are written as {section: {option: value}}
+                json.dump({s: dict(self.parser.items(s, raw=True)) for s in self.parser.sections()}, f)
+            else:
+                self.parser.write(f)
+        os.replace(tmp_file, self.config_file)
+        Configuration._persisted = (self.config_file, self._core_snapshot())
         Configuration.__get__logger().debug("Persisted %s", self.config_file)
 
+    def is_persisted(self):
+        # True if the core section is as it was last read from or written to config_file
+        current = (self.config_file, self._core_snapshot())  # may read the file and set _persisted
+        return Configuration._persisted == current and os.path.exists(self.config_file)
+
+    def _core_snapshot(self):
+        if self.parser.has_section(SECTION_CORE):
+            return self.parser.items(SECTION_CORE)
+        return None
+
     def __set_option__(self, section, option, value):
         if not self.parser.has_section(section):
             self.parser.add_section(section)
@@ -250,10 +305,11 @@ class Configuration(object):
         return self.parser.items(SECTION_CORE)
 
     def core_clear(self):
+        # reads the file first, if not done yet: other sections are kept
         self.parser.remove_section(SECTION_CORE)
 
     # core settings
-    def resource_dir(self, fallback=os.path.expanduser("~")):
+    def resource_dir(self, fallback=_user_home()):
         return self.parser.get(SECTION_CORE, "resource_dir", fallback=fallback)
 
     def set_resource_dir(self, resource_dir):
@@ -394,7 +450,7 @@ class Configuration(object):
         self.__set_option__(SECTION_CORE, "exp_scp_document_root", exp_scp_document_root)
 
     # # zip parameters
-    def zip_filename(self, fallback=os.path.join(os.path.expanduser("~"), "resourcesync.zip")):
+    def zip_filename(self, fallback=os.path.join(_user_home(), "resourcesync.zip")):
         return self.parser.get(SECTION_CORE, "zip_filename", fallback=fallback)
 
     def set_zip_filename(self, zip_filename):
@@ -425,7 +481,7 @@ class Configuration(object):
     def set_imp_scp_remote_path(self, imp_scp_remote_path):
         self.__set_option__(SECTION_CORE, "imp_scp_remote_path", imp_scp_remote_path)
 
-    def imp_scp_local_path(self, fallback=os.path.expanduser("~")):
+    def imp_scp_local_path(self, fallback=_user_home()):
         return self.parser.get(SECTION_CORE, "imp_scp_local_path", fallback=fallback)
 
     def set_imp_scp_local_path(self, imp_scp_local_path):
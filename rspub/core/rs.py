@@ -174,7 +174,7 @@ class ResourceSync(Observable, RsParameters):
         if filenames is None:
             raise RuntimeError("Unable to execute: no filenames.")
 
-        paras = RsParameters(**self.__dict__)
+        paras = RsParameters._trusted_copy(self)
         executor = None
 
         if self.strategy == Strategy.resourcelist or start_new:
@@ -15,6 +15,7 @@ The class :class:`RsParameters` in this module and the class :class:`rspub.core.
 important assets in this endeavour. RsParameters can be associated with a saved :class:`rspub.core.selector.Selector`.
 
 """
+import functools
 import os
 import urllib.parse
 from numbers import Number
@@ -26,8 +27,74 @@ from rspub.util import defaults
 
 WELL_KNOWN_PATH = os.path.join(".well-known", "resourcesync")
 WELL_KNOWN_URL = ".well-known/resourcesync"
+URL_SCHEMES = frozenset(("http", "https"))
 config = None
 
+# (parameter name, configuration getter), in order of assignment in RsParameters.__init__
+PARAMETERS = (
+    ("resource_dir", Configuration.resource_dir),
+    ("metadata_dir", Configuration.metadata_dir),
+    ("description_dir", Configuration.description_dir),
+    ("url_prefix", Configuration.url_prefix),
+    ("strategy", Configuration.strategy),
+    ("selector_file", Configuration.selector_file),
+    ("simple_select_file", Configuration.simple_select_file),
+    ("select_mode", Configuration.select_mode),
+    ("plugin_dir", Configuration.plugin_dir),
+    ("history_dir", Configuration.history_dir),
+    ("max_items_in_list", Configuration.max_items_in_list),
+    ("zero_fill_filename", Configuration.zero_fill_filename),
+    ("is_saving_pretty_xml", Configuration.is_saving_pretty_xml),
+    ("is_saving_sitemaps", Configuration.is_saving_sitemaps),
+    ("has_wellknown_at_root", Configuration.has_wellknown_at_root),
+    ("exp_scp_server", Configuration.exp_scp_server),
+    ("exp_scp_port", Configuration.exp_scp_port),
+    ("exp_scp_user", Configuration.exp_scp_user),
+    ("exp_scp_document_root", Configuration.exp_scp_document_root),
+    ("zip_filename", Configuration.zip_filename),
+    ("imp_scp_server", Configuration.imp_scp_server),
+    ("imp_scp_port", Configuration.imp_scp_port),
+    ("imp_scp_user", Configuration.imp_scp_user),
+    ("imp_scp_remote_path", Configuration.imp_scp_remote_path),
+    ("imp_scp_local_path", Configuration.imp_scp_local_path),
+)
+
+# (attribute name, configuration getter) for results of the last execution
+EXECUTION_RESULTS = (
+    ("last_execution", Configuration.last_excution),
+    ("last_strategy", Configuration.last_strategy),
+    ("last_sitemaps", Configuration.last_sitemaps),
+)
+
+# instance attributes of RsParameters: parameters, derived values and execution results
+ATTRIBUTES = frozenset(["_" + name for name, _ in PARAMETERS] + ["_abs_metadata_dir", "_description_url"] +
+                       [name for name, _ in EXECUTION_RESULTS])
+
+
+@functools.lru_cache(maxsize=64)
+def _validate_url_prefix(value):
+    # validation is pure: many RsParameters share a few url prefixes, so cache the outcome
+    if value.endswith("/"):
+        value = value[:-1]
+    parts = urllib.parse.urlparse(value)
+    if parts.scheme not in URL_SCHEMES:
+        raise ValueError("URL schemes allowed are 'http' or 'https'. Given: '%s'" % value)
+    is_valid_domain = validators.domain(parts.netloc)
+    if not is_valid_domain:
+        raise ValueError("URL has invalid domain name: '%s'. Given: '%s'" % (parts.netloc, value))
+    if parts.query != "":
+        raise ValueError("URL should not have a query string. Given: '%s'" % value)
+    if parts.fragment != "":
+        raise ValueError("URL should not have a fragment. Given: '%s'" % value)
+    # scheme and domain are valid at this point, only a path can still make the url invalid
+    if parts.path != "" or parts.params != "":
+        is_valid_url = validators.url(value)
+        if not is_valid_url:
+            raise ValueError("URL is invalid. Given: '%s'" % value)
+    if not value.endswith("/"):
+        value += "/"
+    return value
+
 
 class RsParameters(object):
     """
@@ -139,113 +206,62 @@ class RsParameters(object):
         if config_name:
             cfg = Configurations.load_configuration(config_name)
         else:
-            cfg = Configuration()
+            cfg = None  # only needed if a parameter is not given
 
+        # derived values are computed as soon as the parameters they depend on are set
         self._resource_dir = None
-        _resource_dir_ = self.__arg__("_resource_dir", cfg.resource_dir(), **kwargs)
-        self.resource_dir = _resource_dir_
-
         self._metadata_dir = None
-        _metadata_dir_ = self.__arg__("_metadata_dir", cfg.metadata_dir(), **kwargs)
-        self.metadata_dir = _metadata_dir_
-
-        self._description_dir = None
-        _description_dir_ = self.__arg__("_description_dir", cfg.description_dir(), **kwargs)
-        self.description_dir = _description_dir_
-
         self._url_prefix = None
-        _url_prefix_ = self.__arg__("_url_prefix", cfg.url_prefix(), **kwargs)
-        self.url_prefix = _url_prefix_
-
-        self._strategy = None
-        _strategy_ = self.__arg__("_strategy", cfg.strategy(), **kwargs)
-        self.strategy = _strategy_
-
-        self._selector_file = None
-        _selector_file_ = self.__arg__("_selector_file", cfg.selector_file(), **kwargs)
-        self.selector_file = _selector_file_
-
-        self._simple_select_file = None
-        _simple_select_file_ = self.__arg__("_simple_select_file", cfg.simple_select_file(), **kwargs)
-        self.simple_select_file = _simple_select_file_
-
-        self._select_mode = None
-        _select_mode_ = self.__arg__("_select_mode", cfg.select_mode(), **kwargs)
-        self.select_mode = _select_mode_
-
-        self._plugin_dir = None
-        _plugin_dir_ = self.__arg__("_plugin_dir", cfg.plugin_dir(), **kwargs)
-        self.plugin_dir = _plugin_dir_
-
-        self._history_dir = None
-        _history_dir_ = self.__arg__("_history_dir", cfg.history_dir(), **kwargs)
-        self.history_dir = _history_dir_
-
-        self._max_items_in_list = None
-        _max_items_in_list_ = self.__arg__("_max_items_in_list", cfg.max_items_in_list(), **kwargs)
-        self.max_items_in_list = _max_items_in_list_
-
-        self._zero_fill_filename = None
-        _zero_fill_filename_ = self.__arg__("_zero_fill_filename", cfg.zero_fill_filename(), **kwargs)
-        self.zero_fill_filename = _zero_fill_filename_
-
-        self._is_saving_pretty_xml = self.__arg__("_is_saving_pretty_xml", cfg.is_saving_pretty_xml(), **kwargs)
-        self._is_saving_sitemaps = self.__arg__("_is_saving_sitemaps", cfg.is_saving_sitemaps(), **kwargs)
-        self._has_wellknown_at_root = self.__arg__("_has_wellknown_at_root", cfg.has_wellknown_at_root(), **kwargs)
-
-        self._exp_scp_server = None
-        _exp_scp_server_ = self.__arg__("_exp_scp_server", cfg.exp_scp_server(), **kwargs)
-        self.exp_scp_server = _exp_scp_server_
-
-        self._exp_scp_port = None
-        _exp_scp_port_ = self.__arg__("_exp_scp_port", cfg.exp_scp_port(), **kwargs)
-        self.exp_scp_port = _exp_scp_port_
-
-        self._exp_scp_user = None
-        _exp_scp_user_ = self.__arg__("_exp_scp_user", cfg.exp_scp_user(), **kwargs)
-        self.exp_scp_user = _exp_scp_user_
-
-        self._exp_scp_document_root = None
-        _exp_scp_document_root_ = self.__arg__("_exp_scp_document_root", cfg.exp_scp_document_root(), **kwargs)
-        self.exp_scp_document_root = _exp_scp_document_root_
-
-        self._zip_filename = None
-        _zip_filename_ = self.__arg__("_zip_filename", cfg.zip_filename(), **kwargs)
-        self.zip_filename = _zip_filename_
-
-        self._imp_scp_server = None
-        _imp_scp_server_ = self.__arg__("_imp_scp_server", cfg.imp_scp_server(), **kwargs)
-        self.imp_scp_server = _imp_scp_server_
-
-        self._imp_scp_port = None
-        _imp_scp_port_ = self.__arg__("_imp_scp_port", cfg.imp_scp_port(), **kwargs)
-        self.imp_scp_port = _imp_scp_port_
-
-        self._imp_scp_user = None
-        _imp_scp_user_ = self.__arg__("_imp_scp_user", cfg.imp_scp_user(), **kwargs)
-        self.imp_scp_user = _imp_scp_user_
-
-        self._imp_scp_remote_path = None
-        _imp_scp_remote_path_ = self.__arg__("_imp_scp_remote_path", cfg.imp_scp_remote_path(), **kwargs)
-        self.imp_scp_remote_path = _imp_scp_remote_path_
-
-        self._imp_scp_local_path = None
-        _imp_scp_local_path_ = self.__arg__("_imp_scp_local_path", cfg.imp_scp_local_path(), **kwargs)
-        self.imp_scp_local_path = _imp_scp_local_path_
-
-        self.last_execution = self.__arg__("last_execution", cfg.last_excution(), **kwargs)
-        self.last_strategy = self.__arg__("last_strategy", cfg.last_strategy(), **kwargs)
-        self.last_sitemaps = self.__arg__("last_sitemaps", cfg.last_sitemaps(), **kwargs)
+        self._has_wellknown_at_root = None
+        self._abs_metadata_dir = None
+        self._description_url = None
+
+        for name, getter in PARAMETERS:
+            value = kwargs.get("_" + name)  # _argument_x
+            if value is None:
+                value = kwargs.get(name)  # argument_x
+            if value is None:
+                if cfg is None:
+                    cfg = Configuration()
+                value = getter(cfg)
+            setattr(self, name, value)
+
+        for name, getter in EXECUTION_RESULTS:
+            value = kwargs.get(name)
+            if value is None:
+                if cfg is None:
+                    cfg = Configuration()
+                value = getter(cfg)
+            elif isinstance(value, list):
+                value = list(value)  # last_sitemaps: clones should not share the list
+            setattr(self, name, value)
 
     @staticmethod
-    def __arg__(name, default=None, **kwargs):
-        value = default
-        ame = name[1:]
-        if name in kwargs and kwargs[name] is not None:
-            value = kwargs[name]  # _argument_x
-        elif ame in kwargs and kwargs[ame] is not None:
-            value = kwargs[ame]  # argument_x
-        return value
+    def _trusted_copy(other):
+        """
+        Copy the parameters of `other`, an RsParameters or subclass, without validating them again.
+
+        Unlike ``RsParameters(**other.__dict__)`` the copy does not touch the file system or the configuration, and
+        parameters that are **None** in `other` stay **None**.
+        """
+        paras = RsParameters.__new__(RsParameters)
+        paras.__dict__.update((k, list(v) if isinstance(v, list) else v)
+                              for k, v in other.__dict__.items() if k in ATTRIBUTES)
+        return paras
+
+    def _recompute_derived(self):
+        if self._resource_dir is None or self._metadata_dir is None:
+            return
+        self._abs_metadata_dir = os.path.join(self._resource_dir, self._metadata_dir)
+        if self._url_prefix is None or self._has_wellknown_at_root is None:
+            return
+        if self._has_wellknown_at_root:
+            r = urllib.parse.urlsplit(self._url_prefix)
+            self._description_url = urllib.parse.urlunsplit([r[0], r[1], WELL_KNOWN_URL, "", ""])
+        else:
+            path = self.abs_metadata_path(WELL_KNOWN_URL)
+            rel_path = os.path.relpath(path, self._resource_dir)
+            self._description_url = self._url_prefix + defaults.sanitize_url_path(rel_path)
 
     @staticmethod
     def _assert_directory(path, arg):
@@ -292,6 +308,7 @@ class RsParameters(object):
         if not (path.endswith(os.path.sep) or path.endswith("\\") or path.endswith("/")):
             path += os.path.sep
         self._resource_dir = path
+        self._recompute_derived()
 
     @property
     def metadata_dir(self):
@@ -319,6 +336,7 @@ class RsParameters(object):
         if path is None or path == "":
             raise ValueError("Invalid value for metadata_dir: path should not be empty")
         self._metadata_dir = path
+        self._recompute_derived()
 
     @property
     def description_dir(self):
@@ -376,24 +394,10 @@ class RsParameters(object):
 
     @url_prefix.setter
     def url_prefix(self, value):
-        if value.endswith("/"):
-            value = value[:-1]
-        parts = urllib.parse.urlparse(value)
-        if parts[0] not in ["http", "https"]:  # scheme
-            raise ValueError("URL schemes allowed are 'http' or 'https'. Given: '%s'" % value)
-        is_valid_domain = validators.domain(parts[1])  # netloc
-        if not is_valid_domain:
-            raise ValueError("URL has invalid domain name: '%s'. Given: '%s'" % (parts[1], value))
-        if parts[4] != "":  # query
-            raise ValueError("URL should not have a query string. Given: '%s'" % value)
-        if parts[5] != "":  # fragment
-            raise ValueError("URL should not have a fragment. Given: '%s'" % value)
-        is_valid_url = validators.url(value)
-        if not is_valid_url:
-            raise ValueError("URL is invalid. Given: '%s'" % value)
-        if not value.endswith("/"):
-            value += "/"
-        self._url_prefix = value
+        if value == self._url_prefix:
+            return
+        self._url_prefix = _validate_url_prefix(value)
+        self._recompute_derived()
 
     @property
     def strategy(self):
@@ -587,6 +591,7 @@ class RsParameters(object):
     @has_wellknown_at_root.setter
     def has_wellknown_at_root(self, at_root):
         self._has_wellknown_at_root = at_root
+        self._recompute_derived()
 
     @property
     def exp_scp_server(self):
@@ -796,7 +801,7 @@ class RsParameters(object):
 
         :return: absolute path to metadata directory
         """
-        return os.path.join(self.resource_dir, self._metadata_dir)
+        return self._abs_metadata_dir
 
     def abs_metadata_path(self, filename):
         """
@@ -847,13 +852,7 @@ class RsParameters(object):
 
         See also: :func:`has_wellknown_at_root`
         """
-        if self.has_wellknown_at_root:
-            r = urllib.parse.urlsplit(self.url_prefix)
-            return urllib.parse.urlunsplit([r[0], r[1], WELL_KNOWN_URL, "", ""])
-        else:
-            path = self.abs_metadata_path(WELL_KNOWN_URL)
-            rel_path = os.path.relpath(path, self.resource_dir)
-            return self.url_prefix + defaults.sanitize_url_path(rel_path)
+        return self._description_url
 
     def capabilitylist_url(self) -> str:
         """
@@ -874,8 +873,12 @@ class RsParameters(object):
         :param str path: the path to calculate the url from
         :return: the url of the path relative to ``resource_dir``
         """
-        rel_path = os.path.relpath(path, self.resource_dir)
-        return self.url_prefix + defaults.sanitize_url_path(rel_path)
+        rel_path = path[len(self._resource_dir):] if path.startswith(self._resource_dir) else ""
+        # resource_dir always ends with a path separator; os.path.relpath gives the same for a normalized
+        # path below resource_dir, but calls os.getcwd twice
+        if not rel_path or os.path.normpath(rel_path) != rel_path:
+            rel_path = os.path.relpath(path, self._resource_dir)
+        return self._url_prefix + defaults.sanitize_url_path(rel_path)
 
     def abs_history_dir(self):
         """
@@ -953,16 +956,16 @@ class RsParameters(object):
         ]
         if as_string:
             f = "{:" + str(fill) + "s}"
-            s = ""
+            parts = []
             for t in tuples:
-                s += " - " if t[0] else " + "
-                s += f.format(t[1])
-                s += str(t[2])
+                parts.append(" - " if t[0] else " + ")
+                parts.append(f.format(t[1]))
+                parts.append(str(t[2]))
                 for extra in t[3:]:
-                    s += " | "
-                    s += str(extra)
-                s += "\n"
-            return s
+                    parts.append(" | ")
+                    parts.append(str(extra))
+                parts.append("\n")
+            return "".join(parts)
         else:
             return tuples
 
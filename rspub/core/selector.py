@@ -4,7 +4,6 @@ import csv
 import logging
 import os
 from enum import Enum
-from itertools import takewhile
 
 from rspub.util.observe import Observable, ObserverInterruptException
 
@@ -26,11 +25,19 @@ class Selector(Observable):
         self.location = location
         self._includes = set()
         self._excludes = set()
-        if self.location:
-            self.read(self.location)
+        # bumped on every change of _includes and _excludes, to know when derived collections should be rebuilt
+        self._includes_rev = 0
+        self._excludes_rev = 0
+        self._sorted_includes = (None, [])
+        self._sorted_excludes = (None, [])
+        self._abs_includes_key = None
+        self._abs_excludes_key = None
+        self._sorted_abs_includes = []
         self._abs_includes = None
         self._abs_excludes = None
-        self._exc_count = 0
+        self._exc_prefixes = ()
+        if self.location:
+            self.read(self.location)
 
     def __iter__(self):
         # alternative implementation would take 2 blobs of filenames (recursive through directories) in memory:
@@ -43,15 +50,33 @@ class Selector(Observable):
         #   + less memory but
         #   - repeatedly iterating the abs_excludes but
         #   + sorted output
-        self._abs_includes = Selector.filter_base_paths({os.path.abspath(x) for x in self._includes})
-        self._abs_excludes = {os.path.abspath(x) for x in self._excludes}
-        self._exc_count = len(self._abs_excludes)
-        generator = self._file_generator()
-        return generator(sorted(self._abs_includes))
+        cwd = os.getcwd()
+        if self._abs_includes_key != (self._includes_rev, cwd):
+            self._abs_includes = Selector.filter_base_paths(Selector._abs_paths(self._includes, cwd))
+            self._sorted_abs_includes = sorted(self._abs_includes)
+            self._abs_includes_key = (self._includes_rev, cwd)
+        if self._abs_excludes_key != (self._excludes_rev, cwd):
+            self._abs_excludes = Selector._abs_paths(self._excludes, cwd)
+            self._exc_prefixes = tuple(self._abs_excludes)
+            self._abs_excludes_key = (self._excludes_rev, cwd)
+        return self._iter_selected_files(self._sorted_abs_includes)
+
+    @staticmethod
+    def _abs_paths(paths, cwd):
+        # same as os.path.abspath on each path, with only one call to os.getcwd
+        return {os.path.normpath(os.path.join(cwd, x)) for x in paths}
 
     @staticmethod
     def filter_base_paths(abs_paths):
-        return {x for x in abs_paths if Selector.is_base_path(x, abs_paths)}
+        # same result as {x for x in abs_paths if Selector.is_base_path(x, abs_paths)}, in O(n log n):
+        # in sorted order all paths that start with a base path directly follow that base path.
+        base_paths = set()
+        base_path = None
+        for x in sorted(abs_paths):
+            if base_path is None or not x.startswith(base_path):
+                base_paths.add(x)
+                base_path = x
+        return base_paths
 
     @staticmethod
     def is_base_path(x, other_paths):
@@ -63,166 +88,197 @@ class Selector(Observable):
         return base_path
 
     def __len__(self):
-        return len([x for x in self])
-
-    def _file_generator(self):
-
-        def generator(filenames):
-            for name in filenames:
-                file = os.path.abspath(name)
-                if not os.path.exists(file):
-                    LOG.warning("File does not exist: %s" % file)
-                    self.observers_inform(self, SelectorEvent.file_does_not_exist, filename=file)
-                elif os.path.isdir(file):
-                    for rfile in generator(self._walk_directories(file)):
-                        yield  rfile
-                elif os.path.isfile(file):
-                    if not self.observers_confirm(self, SelectorEvent.next_file, filename=file):
-                        raise ObserverInterruptException("Process interrupted on SelectorEvent.next_file")
-                    if len(list(takewhile(lambda x: not file.startswith(x), self._abs_excludes))) == self._exc_count:
-                        yield file
+        return sum(1 for _ in self)
+
+    def _iter_selected_files(self, abs_filenames):
+        for file in abs_filenames:
+            if not os.path.exists(file):
+                LOG.warning("File does not exist: %s" % file)
+                self.observers_inform(self, SelectorEvent.file_does_not_exist, filename=file)
+            elif os.path.isdir(file):
+                for entry in self._scan_directory(file):
+                    if entry.is_file():
+                        if self._is_selected(entry.path):
+                            yield entry.path
+                    elif not os.path.exists(entry.path):
+                        LOG.warning("File does not exist: %s" % entry.path)
+                        self.observers_inform(self, SelectorEvent.file_does_not_exist, filename=entry.path)
                     else:
-                        if not self.observers_confirm(self, SelectorEvent.file_excluded, filename=file):
-                            raise ObserverInterruptException("Process interrupted on SelectorEvent.file_excluded")
-                else:
-                    LOG.warning("Not a regular file: %s" % file)
-                    self.observers_inform(self, SelectorEvent.not_a_regular_file, filename=file)
+                        LOG.warning("Not a regular file: %s" % entry.path)
+                        self.observers_inform(self, SelectorEvent.not_a_regular_file, filename=entry.path)
+            elif os.path.isfile(file):
+                if self._is_selected(file):
+                    yield file
+            else:
+                LOG.warning("Not a regular file: %s" % file)
+                self.observers_inform(self, SelectorEvent.not_a_regular_file, filename=file)
+
+    def _is_selected(self, file):
+        if not self.observers_confirm(self, SelectorEvent.next_file, filename=file):
+            raise ObserverInterruptException("Process interrupted on SelectorEvent.next_file")
+        if not file.startswith(self._exc_prefixes):
+            return True
+        if not self.observers_confirm(self, SelectorEvent.file_excluded, filename=file):
+            raise ObserverInterruptException("Process interrupted on SelectorEvent.file_excluded")
+        return False
 
-        return generator
+    @staticmethod
+    def _scan_directory(directory):
+        # same selection and order as os.walk(directory): does not follow symbolic links to directories
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    entries = list(it)
+            except OSError:
+                LOG.warning("Unable to scan directory: %s" % current)
+                continue
+            sub_directories = []
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    sub_directories.append(entry.path)
+                elif not entry.is_dir():
+                    yield entry
+            # pushed in reverse, so that subdirectories are visited in scan order
+            stack.extend(reversed(sub_directories))
 
     @staticmethod
     def _walk_directories(*directories):
         for directory in directories:
             abs_dir = os.path.abspath(directory)
-            for root, _directories, _filenames in os.walk(abs_dir):
-                for filename in _filenames:
-                    file = os.path.join(root, filename)
-                    yield file
+            for entry in Selector._scan_directory(abs_dir):
+                yield entry.path
 
     def include(self, *filenames):
-        for item in filenames:
-            if isinstance(item, str):
-                self._includes.add(item)
-            elif isinstance(item, Selector):
-                self._includes.update(item._includes)
-            elif hasattr(item, '__iter__'):
-                for thing in item:
-                    self.include(thing)
-            else:
-                raise ValueError("Illegal argument: %s" % item)
+        self._includes_rev += 1
+        self._includes.update(Selector._entries(filenames, "_includes"))
 
     def exclude(self, *filenames):
-        for item in filenames:
-            if isinstance(item, str):
-                self._excludes.add(item)
-            elif isinstance(item, Selector):
-                self._excludes.update(item._excludes)
-            elif hasattr(item, '__iter__'):
-                for thing in item:
-                    self.exclude(thing)
-            else:
-                raise ValueError("Illegal argument: %s" % item)
+        self._excludes_rev += 1
+        self._excludes.update(Selector._entries(filenames, "_excludes"))
 
     def discard_include(self, *filenames):
-        for item in filenames:
-            if isinstance(item, str):
-                self._includes.discard(item)
-            elif isinstance(item, Selector):
-                self._includes.difference_update(item._includes)
-            elif hasattr(item, '__iter__'):
-                for thing in item:
-                    self.discard_include(thing)
-            else:
-                raise ValueError("Illegal argument: %s" % item)
+        if any(item is self for item in filenames):
+            # discarding all own includes leaves nothing
+            self.clear_includes()
+            return
+        self._includes_rev += 1
+        # materialize: this selector may still be nested in filenames
+        self._includes.difference_update(list(Selector._entries(filenames, "_includes")))
 
     def discard_exclude(self, *filenames):
+        if any(item is self for item in filenames):
+            self.clear_excludes()
+            return
+        self._excludes_rev += 1
+        self._excludes.difference_update(list(Selector._entries(filenames, "_excludes")))
+
+    @staticmethod
+    def _entries(filenames, selector_entries):
+        # flattens strings, Selectors and (nested) iterables of these to strings
         for item in filenames:
             if isinstance(item, str):
-                self._excludes.discard(item)
+                yield item
             elif isinstance(item, Selector):
-                self._excludes.difference_update(item._excludes)
+                yield from getattr(item, selector_entries)
             elif hasattr(item, '__iter__'):
-                for thing in item:
-                    self.discard_exclude(thing)
+                yield from Selector._entries(item, selector_entries)
             else:
                 raise ValueError("Illegal argument: %s" % item)
 
     def clear_includes(self):
+        self._includes_rev += 1
         self._includes.clear()
 
     def clear_excludes(self):
+        self._excludes_rev += 1
         self._excludes.clear()
 
+    def _get_sorted_includes(self):
+        if self._sorted_includes[0] != self._includes_rev:
+            self._sorted_includes = (self._includes_rev, sorted(self._includes))
+        return self._sorted_includes[1]
+
+    def _get_sorted_excludes(self):
+        if self._sorted_excludes[0] != self._excludes_rev:
+            self._sorted_excludes = (self._excludes_rev, sorted(self._excludes))
+        return self._sorted_excludes[1]
+
     def list_includes(self):
-        return self._list_files()(sorted(self._includes))
+        return self._iter_listed_files(self._get_sorted_includes())
 
     def list_excludes(self):
-        return self._list_files()(sorted(self._excludes))
-
-    def _list_files(self):
-
-        def generator(filenames):
-            for name in filenames:
-                file = os.path.abspath(name)
-                if not os.path.exists(file):
-                    LOG.warning("File does not exist: %s" % file)
-                elif os.path.isdir(file):
-                    for rfile in generator(self._walk_directories(file)):
-                        yield  rfile
-                    pass
-                elif os.path.isfile(file):
-                    yield file
-                else:
-                    LOG.warning("Not a regular file: %s" % file)
-
-        return generator
+        return self._iter_listed_files(self._get_sorted_excludes())
+
+    def _iter_listed_files(self, filenames):
+        for name in filenames:
+            file = os.path.abspath(name)
+            if not os.path.exists(file):
+                LOG.warning("File does not exist: %s" % file)
+            elif os.path.isdir(file):
+                for entry in self._scan_directory(file):
+                    if entry.is_file():
+                        yield entry.path
+                    elif not os.path.exists(entry.path):
+                        LOG.warning("File does not exist: %s" % entry.path)
+                    else:
+                        LOG.warning("Not a regular file: %s" % entry.path)
+            elif os.path.isfile(file):
+                yield file
+            else:
+                LOG.warning("Not a regular file: %s" % file)
 
     def relativize_includes(self, root_path):
+        self._includes_rev += 1
         self._includes = {os.path.relpath(x, root_path) for x in self._includes}
         return self.get_included_entries()
 
     def relativize_excludes(self, root_path):
+        self._excludes_rev += 1
         self._excludes = {os.path.relpath(x, root_path) for x in self._excludes}
         return self.get_excluded_entries()
 
+    # copies: derived collections are cached by revision, so the entries may only change through this selector
     def get_included_entries(self):
-        return self._includes
+        return set(self._includes)
 
     def get_excluded_entries(self):
-        return self._excludes
+        return set(self._excludes)
 
     def is_empty(self):
         return len(self._includes) + len(self._excludes) == 0
 
     def read_includes(self, filename):
+        self._includes_rev += 1
         with open(filename, "r", encoding="utf-8") as file:
-            self.include(file.read().splitlines())
+            self._includes.update(line.rstrip("\n") for line in file if line.strip())
 
     def read_excludes(self, filename):
+        self._excludes_rev += 1
         with open(filename, "r", encoding="utf-8") as file:
-            self.exclude(file.read().splitlines())
+            self._excludes.update(line.rstrip("\n") for line in file if line.strip())
 
     def write_includes(self, filename):
         with open(filename, 'w', encoding="utf-8") as file:
-            for item in sorted(self._includes):
-                file.write("{}\n".format(item))
+            file.write("".join(item + "\n" for item in self._get_sorted_includes()))
 
     def write_excludes(self, filename):
         with open(filename, 'w', encoding="utf-8") as file:
-            for item in sorted(self._excludes):
-                file.write("{}\n".format(item))
+            file.write("".join(item + "\n" for item in self._get_sorted_excludes()))
 
     def write(self, filename=None):
         if filename is None:
             filename = self.location
         if filename is None:
             raise RuntimeError("No filename, no location. Cannot save selector.")
-        with open(filename, 'w', encoding="utf-8", newline='') as file:
+        # write next to the target and rename, so that a failed write does not leave a truncated selector file
+        tmp_filename = filename + ".tmp"
+        with open(tmp_filename, 'w', encoding="utf-8", newline='') as file:
             writer = csv.writer(file, quoting=csv.QUOTE_ALL)
-            for item in self._includes:
-                writer.writerow(["+", item])
-            for item in self._excludes:
-                writer.writerow(["-", item])
+            writer.writerows(["+", item] for item in self._includes)
+            writer.writerows(["-", item] for item in self._excludes)
+        os.replace(tmp_filename, filename)
         self.location = filename
 
     def read(self, filename):
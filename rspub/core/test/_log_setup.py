@@ -0,0 +1,28 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+import logging
+import os
+import sys
+
+_done = False
+
+
+def configure_once():
+    """
+    Log to stdout, at level INFO or, if the environment variable RSPUB_DEBUG is set, at level DEBUG. Only the first
+    call adds a handler to the root logger, so test classes that all call this in their setUpClass do not print each
+    record multiple times.
+    """
+    global _done
+    if _done:
+        return
+    level = logging.DEBUG if os.environ.get("RSPUB_DEBUG") else logging.INFO
+    root = logging.getLogger()
+    root.setLevel(level)
+    if not any(isinstance(h, logging.StreamHandler) and h.stream is sys.stdout for h in root.handlers):
+        ch = logging.StreamHandler(sys.stdout)
+        ch.setLevel(level)
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s')
+        ch.setFormatter(formatter)
+        root.addHandler(ch)
+    _done = True
@@ -1,30 +1,23 @@
 #! /usr/bin/env python3
 # -*- coding: utf-8 -*-
+import os
+import tempfile
 import unittest
+import urllib.parse
 
-import logging
-
-import sys
-
-from resync import Resource
+from resync import Resource, ResourceList, ChangeList
 
 from rspub.core.audit import Audit
 from rspub.core.rs_paras import RsParameters
 from rspub.core.transport import ResourceAuditor
+from rspub.core.test._log_setup import configure_once
 
 
 @unittest.skip("Run only when configuration DEFAULT has been properly executed.")
 class TestResourceAuditor(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        # logging:
-        root = logging.getLogger()
-        root.setLevel(logging.DEBUG)
-        ch = logging.StreamHandler(sys.stdout)
-        ch.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s')
-        ch.setFormatter(formatter)
-        root.addHandler(ch)
+        configure_once()
 
     def test_run_audit(self):
         paras = RsParameters(config_name="DEFAULT")
@@ -41,3 +34,123 @@ class TestResourceAuditor(unittest.TestCase):
         generator = raud.get_generator(all_resources=True)
         for resource, src, relpath in generator():
             self.assertEquals(Resource, type(resource))
+
+
+class TestResourceAuditorSitemaps(unittest.TestCase):
+
+    def test_iter_resources(self):
+        rl = ResourceList()
+        rl.add(Resource("http://example.com/a.txt", md5="aaa", length=3))
+        rl.add(Resource("http://example.com/b.txt", md5="bbb", length=3))
+        cl = ChangeList()
+        cl.add(Resource("http://example.com/a.txt", change="deleted"))
+        cl.add(Resource("http://example.com/c.txt", md5="ccc", change="created"))
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            rl_file = os.path.join(tmpdirname, "resourcelist_0000.xml")
+            cl_file = os.path.join(tmpdirname, "changelist_0000.xml")
+            with open(rl_file, "w", encoding="utf-8") as file:
+                file.write(rl.as_xml())
+            with open(cl_file, "w", encoding="utf-8") as file:
+                file.write(cl.as_xml())
+
+            resources = list(ResourceAuditor._iter_resources(rl_file))
+            self.assertEqual(["http://example.com/a.txt", "http://example.com/b.txt"], [r.uri for r in resources])
+            self.assertEqual("bbb", resources[1].md5)
+            self.assertEqual(3, resources[1].length)
+
+            resources = list(ResourceAuditor._iter_resources(cl_file))
+            self.assertEqual(["deleted", "created"], [r.change for r in resources])
+
+    def test_cached_glob(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            raud = ResourceAuditor(RsParameters(resource_dir=tmpdirname, metadata_dir="metadata"))
+            pattern = os.path.join(tmpdirname, "metadata", "*.xml")
+            self.assertEqual([], raud._cached_glob(pattern))
+
+            os.makedirs(os.path.join(tmpdirname, "metadata"))
+            open(os.path.join(tmpdirname, "metadata", "a.xml"), "w").close()
+            files = raud._cached_glob(pattern)
+            self.assertEqual([os.path.join(tmpdirname, "metadata", "a.xml")], files)
+            # a changed result does not change the next one
+            files.clear()
+            self.assertEqual([os.path.join(tmpdirname, "metadata", "a.xml")], raud._cached_glob(pattern))
+
+            # outside a transport run the directory is listed on every call
+            open(os.path.join(tmpdirname, "metadata", "b.xml"), "w").close()
+            self.assertEqual(2, len(raud._cached_glob(pattern)))
+
+            # during a run it is listed once
+            raud._listdir_cache = {}
+            self.assertEqual(2, len(raud._cached_glob(pattern)))
+            open(os.path.join(tmpdirname, "metadata", "c.xml"), "w").close()
+            self.assertEqual(2, len(raud._cached_glob(pattern)))
+            self.assertEqual([os.path.join(tmpdirname, "metadata", "a.xml")], raud._cached_glob(
+                os.path.join(tmpdirname, "metadata", "a*.xml")))
+
+    def test_extract_paths(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            raud = ResourceAuditor(RsParameters(resource_dir=tmpdirname, url_prefix="http://example.com/site/"))
+            for uri in ["http://example.com/site/a.txt", "http://example.com/site/sub/b%20c.txt",
+                        "http://example.com/site/sub//d.txt", "http://example.com/site/sub/../e.txt",
+                        "http://example.com/site/f/", "http://example.com/site", "http://example.com/other/g.txt"]:
+                relpath = urllib.parse.unquote(os.path.relpath(uri, raud.paras.url_prefix))
+                self.assertEqual((os.path.join(tmpdirname, relpath), relpath), raud.extract_paths(uri), uri)
+
+    def test_all_resources(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            paras = RsParameters(resource_dir=tmpdirname, metadata_dir="metadata")
+            os.makedirs(paras.abs_metadata_dir())
+            # several resourcelists and a changelist
+            for i in range(4):
+                rl = ResourceList()
+                rl.add(Resource("http://example.com/doc_%d.txt" % i, md5="md5_%d" % i))
+                with open(paras.abs_metadata_path("resourcelist_%04d.xml" % i), "w", encoding="utf-8") as file:
+                    file.write(rl.as_xml())
+            cl = ChangeList()
+            cl.add(Resource("http://example.com/doc_0.txt", change="deleted"))
+            cl.add(Resource("http://example.com/doc_4.txt", md5="md5_4", change="created"))
+            with open(paras.abs_metadata_path("changelist_0000.xml"), "w", encoding="utf-8") as file:
+                file.write(cl.as_xml())
+
+            all_resources = ResourceAuditor(paras).all_resources()
+            self.assertEqual(["http://example.com/doc_%d.txt" % i for i in range(1, 5)], sorted(all_resources))
+            self.assertEqual("md5_4", all_resources["http://example.com/doc_4.txt"].md5)
+
+    def test_iter_all_resources(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            paras = RsParameters(resource_dir=tmpdirname, metadata_dir="metadata")
+            os.makedirs(paras.abs_metadata_dir())
+            rl = ResourceList()
+            for name in "abcd":
+                rl.add(Resource("http://example.com/" + name, md5=name))
+            cl = ChangeList()
+            cl.add(Resource("http://example.com/b", change="deleted"))
+            cl.add(Resource("http://example.com/e", change="created"))
+            cl.add(Resource("http://example.com/c", md5="c2", change="updated"))
+            cl.add(Resource("http://example.com/b", change="created"))
+            cl.add(Resource("http://example.com/e", change="deleted"))
+            for filename, sitemap in (("resourcelist_0000.xml", rl), ("changelist_0000.xml", cl)):
+                with open(paras.abs_metadata_path(filename), "w", encoding="utf-8") as file:
+                    file.write(sitemap.as_xml())
+
+            raud = ResourceAuditor(paras)
+            resources = list(raud._iter_all_resources())
+            self.assertEqual(["http://example.com/" + name for name in "acdb"], [r.uri for r in resources])
+            self.assertEqual("c2", resources[1].md5)
+            self.assertEqual([r.uri for r in resources], list(raud.all_resources()))
+
+    def test_iter_all_resources_duplicates(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            paras = RsParameters(resource_dir=tmpdirname, metadata_dir="metadata")
+            os.makedirs(paras.abs_metadata_dir())
+            for i, names in enumerate(("ab", "bc")):
+                rl = ResourceList()
+                for name in names:
+                    rl.add(Resource("http://example.com/" + name, md5=name + str(i)))
+                with open(paras.abs_metadata_path("resourcelist_%04d.xml" % i), "w", encoding="utf-8") as file:
+                    file.write(rl.as_xml())
+
+            # first place, last value: as in all_resources
+            resources = list(ResourceAuditor(paras)._iter_all_resources())
+            self.assertEqual(["http://example.com/" + name for name in "abc"], [r.uri for r in resources])
+            self.assertEqual(["a0", "b1", "c1"], [r.md5 for r in resources])
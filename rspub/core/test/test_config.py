@@ -1,25 +1,21 @@
 #! /usr/bin/env python3
 # -*- coding: utf-8 -*-
-import logging
 import os
 import platform
-import sys
+import tempfile
 import unittest
 
 from rspub.core import config
 from rspub.core.config import Configuration, Configurations
+from rspub.core.test._log_setup import configure_once
+
+_SYSTEM = platform.system()
 
 
 class TestConfigurations(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        root = logging.getLogger()
-        root.setLevel(logging.DEBUG)
-        ch = logging.StreamHandler(sys.stdout)
-        ch.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s')
-        ch.setFormatter(formatter)
-        root.addHandler(ch)
+        configure_once()
 
     def test_current_configuration_name(self):
         # No name change
@@ -78,13 +74,7 @@ class TestConfigurations(unittest.TestCase):
 class TestConfiguration(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        root = logging.getLogger()
-        root.setLevel(logging.DEBUG)
-        ch = logging.StreamHandler(sys.stdout)
-        ch.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s')
-        ch.setFormatter(formatter)
-        root.addHandler(ch)
+        configure_once()
 
     def test01_set_test_config(self):
         # print("\n>>> Testing set_test_config")
@@ -107,12 +97,12 @@ class TestConfiguration(unittest.TestCase):
         assert config1 == config2
 
         path1 = config1.config_path
-        if platform.system() == "Darwin":
+        if _SYSTEM == "Darwin":
             assert path1 == os.path.expanduser("~") + "/.config/rspub/core"
-        elif platform.system() == "Windows":
+        elif _SYSTEM == "Windows":
             path_expected = os.path.join(os.path.expanduser("~"), "AppData", "Local", "rspub", "core")
             assert path1 == path_expected
-        elif platform.system() == "Linux":
+        elif _SYSTEM == "Linux":
             assert path1 == os.path.expanduser("~") + "/.config/rspub/core"
         else:
             assert path1 == os.path.expanduser("~") + "/rspub/core"
@@ -194,3 +184,103 @@ class TestConfiguration(unittest.TestCase):
 
 
 
+
+class TestConfigurationFile(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_once()
+        # keep the configurations written by these tests out of the user's configuration directory
+        cls._cfg_dir = tempfile.TemporaryDirectory()
+        Configuration._set_configuration_dir(cls._cfg_dir.name)
+        Configuration.reset()
+
+    @classmethod
+    def tearDownClass(cls):
+        Configuration._set_configuration_dir(None)
+        Configuration.reset()
+        cls._cfg_dir.cleanup()
+
+    def tearDown(self):
+        Configuration._set_configuration_filename(None)
+        Configuration.reset()
+        for name in os.listdir(self._cfg_dir.name):
+            os.remove(os.path.join(self._cfg_dir.name, name))
+
+    def test_core_clear_keeps_other_sections(self):
+        Configuration._set_configuration_filename("rspub_test_core_clear.cfg")
+        Configuration.reset()
+        cfg = Configuration()
+        with open(cfg.config_file, "w", encoding="utf-8") as f:
+            f.write("[core]\nplugin_dir = foo/bar/plugins\n\n[other]\nkey = value\n\n")
+        Configuration.reset()
+
+        cfg = Configuration()
+        cfg.core_clear()
+        self.assertIsNone(cfg.plugin_dir())
+        self.assertFalse(cfg.is_persisted())
+        cfg.persist()
+        Configuration.reset()
+
+        cfg = Configuration()
+        self.assertIsNone(cfg.plugin_dir())
+        self.assertEqual("value", cfg.parser.get("other", "key"))
+
+    def test_is_persisted(self):
+        Configuration._set_configuration_filename("rspub_test_is_persisted.cfg")
+        Configuration.reset()
+        cfg = Configuration()
+        cfg.set_metadata_dir("foo/bar/md1")
+        cfg.persist()
+        self.assertTrue(cfg.is_persisted())
+
+        cfg.set_metadata_dir("foo/bar/md1")
+        self.assertTrue(cfg.is_persisted())
+
+        cfg.set_metadata_dir("foo/bar/md2")
+        self.assertFalse(cfg.is_persisted())
+
+        cfg.persist()
+        os.remove(cfg.config_file)
+        self.assertFalse(cfg.is_persisted())
+
+        # persist only writes when needed
+        cfg.persist()
+        mtime = os.stat(cfg.config_file).st_mtime_ns
+        cfg.persist()
+        self.assertEqual(mtime, os.stat(cfg.config_file).st_mtime_ns)
+
+    def test_lazy_read(self):
+        Configuration._set_configuration_filename("rspub_test_lazy_read.cfg")
+        Configuration.reset()
+        cfg = Configuration()
+        cfg.set_plugin_dir("foo/bar/plugins")
+        cfg.persist()
+        Configuration.reset()
+
+        cfg = Configuration()
+        self.assertIsNone(Configuration._parser)
+        self.assertEqual("foo/bar/plugins", cfg.plugin_dir())
+        self.assertIsNotNone(Configuration._parser)
+
+        Configuration.reset()
+        cfg = Configuration()
+        cfg.core_clear()
+        self.assertIsNone(cfg.plugin_dir())
+        self.assertFalse(cfg.is_persisted())
+
+    def test_persist_json(self):
+        Configuration._set_configuration_filename("rspub_test_persist.json")
+        Configuration.reset()
+        cfg = Configuration()
+        cfg.core_clear()
+        cfg.set_max_items_in_list(42)
+        cfg.set_is_saving_pretty_xml(False)
+        cfg.set_last_sitemaps(["foo/bar/bas.txt", "foo/bar/bord.txt"])
+        cfg.persist()
+        Configuration.reset()
+
+        cfg = Configuration()
+        self.assertEqual(42, cfg.max_items_in_list())
+        self.assertEqual(False, cfg.is_saving_pretty_xml())
+        self.assertEqual(["foo/bar/bas.txt", "foo/bar/bord.txt"], cfg.last_sitemaps())
+        self.assertTrue(cfg.is_persisted())
@@ -1,19 +1,20 @@
 #! /usr/bin/env python3
 # -*- coding: utf-8 -*-
+import functools
 import os
 import unittest
 
 import logging
 
-import sys
-
 from rspub.core.importer import Importer
 from rspub.core.rs_paras import RsParameters
 from rspub.util.observe import EventLogger
+from rspub.core.test._log_setup import configure_once
 
 CFG_FILE = "src/importer_test_on_nzandbak.cfg"
 
 
+@functools.lru_cache(maxsize=2)
 def precondition_remote_server_config(as_string=False):
     msg = "Ok"
     cfg_file = os.path.join(os.path.expanduser("~"), CFG_FILE)
@@ -29,14 +30,7 @@ def precondition_remote_server_config(as_string=False):
 class TestImporter(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        # logging:
-        root = logging.getLogger()
-        root.setLevel(logging.DEBUG)
-        ch = logging.StreamHandler(sys.stdout)
-        ch.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s')
-        ch.setFormatter(formatter)
-        root.addHandler(ch)
+        configure_once()
 
     @unittest.skipUnless(precondition_remote_server_config(), precondition_remote_server_config(as_string=True))
     def test_scp_get(self):
@@ -1,9 +1,9 @@
 #! /usr/bin/env python3
 # -*- coding: utf-8 -*-
 import datetime
+import functools
 import logging
 import os
-import sys
 import unittest
 
 from rspub.core.config import Configuration, Configurations
@@ -12,20 +12,29 @@ from rspub.core.rs_enum import Strategy
 from rspub.core.rs_paras import RsParameters
 from rspub.core.selector import Selector
 from rspub.util.observe import EventLogger
+from rspub.core.test._log_setup import configure_once
+
+_USER_HOME = os.path.expanduser("~")
+_METADATA_DIR = os.path.join("tmp", "rs", "metadata")
+_TEST_RESOURCE = os.path.join(_USER_HOME, "tmp", "rs")
+_TEST_DATA = os.path.join(_TEST_RESOURCE, "test_data")
+_DIRECTORY_1 = os.path.join(_TEST_RESOURCE, "directory_1")
+_DOCUMENT_1 = os.path.join(_DIRECTORY_1, "document_1.txt")
 
 
 def resource_dir():
-    return os.path.expanduser("~")
+    return _USER_HOME
 
 
 def metadata_dir():
-    return os.path.join("tmp", "rs", "metadata")
+    return _METADATA_DIR
 
 
 def test_resource():
-    return os.path.join(resource_dir(), "tmp", "rs")
+    return _TEST_RESOURCE
 
 
+@functools.lru_cache(maxsize=2)
 def precondition(as_string=False):
     msg = "Ok"
     test_dir = test_resource()
@@ -44,13 +53,7 @@ def precondition(as_string=False):
 class TestResourceSync(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        root = logging.getLogger()
-        root.setLevel(logging.DEBUG)
-        ch = logging.StreamHandler(sys.stdout)
-        ch.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s')
-        ch.setFormatter(formatter)
-        root.addHandler(ch)
+        configure_once()
         #Configuration().persist()
         Configuration.reset()
 
@@ -96,20 +99,16 @@ class TestResourceSync(unittest.TestCase):
         rs.execute(filenames)
 
     def change_file_contents(self):
-        folder = os.path.join(test_resource(), "directory_1")
-        if not os.path.exists(folder):
-            os.makedirs(folder, exist_ok=True)
-
-        filename = os.path.join(folder, "document_1.txt")
-        with open(filename, "a") as file:
+        os.makedirs(_DIRECTORY_1, exist_ok=True)
+        with open(_DOCUMENT_1, "a") as file:
             file.write("\n%s" % str(datetime.datetime.now()))
 
     def test_with_selector(self):
         metadata = os.path.join("tmp", "rs", "md_select")
 
         selector = Selector()
-        os.makedirs(os.path.join(resource_dir(), "tmp", "rs", "test_data"), exist_ok=True)
-        selector.location = os.path.join(resource_dir(), "tmp", "rs", "test_data", "selector1.txt")
+        os.makedirs(_TEST_DATA, exist_ok=True)
+        selector.location = os.path.join(_TEST_DATA, "selector1.txt")
         selector.include(test_resource())
         selector.exclude(os.path.join(test_resource(), "collection2"))
 
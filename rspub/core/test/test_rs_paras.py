@@ -1,115 +1,129 @@
 #! /usr/bin/env python3
 # -*- coding: utf-8 -*-
 import os
+import shutil
+import tempfile
 import unittest
 
 from rspub.core.config import Configuration, Configurations
 from rspub.core.rs_enum import Strategy
 from rspub.core.rs_paras import RsParameters
+from rspub.util import defaults
+
+_USER_HOME = os.path.expanduser("~")
 
 
 class TestRsParameters(unittest.TestCase):
     maxDiff = None
 
+    @classmethod
+    def setUpClass(cls):
+        # keep the configurations written by these tests out of the user's configuration directory
+        # /dev/shm is memory-backed, but only exists on Linux; elsewhere the system temp directory is used
+        shm = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+        cls._cfg_dir = tempfile.mkdtemp(dir=shm)
+        Configuration._set_configuration_dir(cls._cfg_dir)
+        Configuration.reset()
+
+    @classmethod
+    def tearDownClass(cls):
+        Configuration._set_configuration_dir(None)
+        Configuration.reset()
+        shutil.rmtree(cls._cfg_dir)
+
     def setUp(self):
         Configuration._set_configuration_filename("test_rs_paras.cfg")
+        # every test starts from configuration defaults
+        Configuration().core_clear()
 
     def tearDown(self):
         Configuration._set_configuration_filename(None)
 
     def test_load_configuration(self):
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEquals("test_rs_paras", rsp.configuration_name())
+        self.assertEqual("test_rs_paras", rsp.configuration_name())
 
         rsp.max_items_in_list=5566
         rsp.save_configuration_as("realy_not_a_name_for_config")
-        self.assertEquals("realy_not_a_name_for_config", rsp.configuration_name())
+        self.assertEqual("realy_not_a_name_for_config", rsp.configuration_name())
 
         rsp = RsParameters(config_name="realy_not_a_name_for_config")
-        self.assertEquals(5566, rsp.max_items_in_list)
+        self.assertEqual(5566, rsp.max_items_in_list)
 
         self.assertTrue("realy_not_a_name_for_config" in Configurations.list_configurations())
 
         Configurations.remove_configuration("realy_not_a_name_for_config")
 
-        with self.assertRaises(Exception) as context:
+        with self.assertRaises(ValueError) as context:
             RsParameters(config_name="realy_not_a_name_for_config")
-        self.assertIsInstance(context.exception, ValueError)
 
         Configuration().reset()
         rsp = RsParameters()
-        self.assertEquals("realy_not_a_name_for_config", rsp.configuration_name())
+        self.assertEqual("realy_not_a_name_for_config", rsp.configuration_name())
 
     def test_resource_dir(self):
-        user_home = os.path.expanduser("~")
+        user_home = _USER_HOME
 
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEquals(rsp.resource_dir, user_home + os.sep)
+        self.assertEqual(rsp.resource_dir, user_home + os.sep)
 
         resource_dir = user_home
 
         rsp = RsParameters(resource_dir=resource_dir)
-        self.assertEquals(rsp.resource_dir, resource_dir + os.sep)
+        self.assertEqual(rsp.resource_dir, resource_dir + os.sep)
 
         # contamination test
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals(rsp2.resource_dir, resource_dir + os.sep)
-        assert(rsp.__dict__ == rsp2.__dict__)
+        rsp2 = self.assert_clone(rsp)
+        self.assertEqual(rsp2.resource_dir, resource_dir + os.sep)
 
-        with self.assertRaises(Exception) as context:
+        with self.assertRaises(ValueError) as context:
             rsp.resource_dir = "/foo/bar"
         #print(context.exception)
-        self.assertIsInstance(context.exception, ValueError)
 
         self.save_configuration_test(rsp)
 
     def test_relative_resource_dir(self):
         resource_dir = "."
         rsp = RsParameters(resource_dir=resource_dir)
-        self.assertEquals(os.path.abspath(".") + os.sep, rsp.resource_dir)
+        self.assertEqual(os.path.abspath(".") + os.sep, rsp.resource_dir)
         #print(">>>>>>>>>>>>>> resource_dir according to rsparas=%s" % rsp.resource_dir)
-        self.assertEquals(os.getcwd() + os.sep, rsp.resource_dir)
+        self.assertEqual(os.getcwd() + os.sep, rsp.resource_dir)
 
     def test_metadata_dir(self):
-        user_home = os.path.expanduser("~")
+        user_home = _USER_HOME
 
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEquals("metadata", rsp.metadata_dir)
-        self.assertEquals(rsp.abs_metadata_dir(), os.path.join(user_home, "metadata"))
+        self.assertEqual("metadata", rsp.metadata_dir)
+        self.assertEqual(rsp.abs_metadata_dir(), os.path.join(user_home, "metadata"))
 
         resource_dir = user_home
 
         rsp = RsParameters(metadata_dir=os.path.join("foo", "md1"), resource_dir=resource_dir)
         # print(rsp.abs_metadata_dir())
-        self.assertEquals(rsp.abs_metadata_dir(), os.path.join(resource_dir, "foo", "md1"))
+        self.assertEqual(rsp.abs_metadata_dir(), os.path.join(resource_dir, "foo", "md1"))
         # @ToDo test for windows pathnames: 'foo\md1', 'C:foo\bar\baz'
 
         here = os.path.dirname(__file__)
         rsp.resource_dir = here
-        self.assertEquals(rsp.abs_metadata_dir(), os.path.join(here, "foo", "md1"))
+        self.assertEqual(rsp.abs_metadata_dir(), os.path.join(here, "foo", "md1"))
 
         # contamination test
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals(rsp2.abs_metadata_dir(), os.path.join(here, "foo", "md1"))
+        rsp2 = self.assert_clone(rsp)
+        self.assertEqual(rsp2.abs_metadata_dir(), os.path.join(here, "foo", "md1"))
 
-        with self.assertRaises(Exception) as context:
-            rsp.metadata_dir = os.path.expanduser("~")
+        with self.assertRaises(ValueError) as context:
+            rsp.metadata_dir = _USER_HOME
         # print(context.exception)
-        self.assertEquals("Invalid value for metadata_dir: path should not be absolute: " + os.path.expanduser("~"),
+        self.assertEqual("Invalid value for metadata_dir: path should not be absolute: " + _USER_HOME,
                               context.exception.args[0])
-        self.assertIsInstance(context.exception, ValueError)
 
-        with self.assertRaises(Exception) as context:
+        with self.assertRaises(ValueError) as context:
             rsp.metadata_dir = "/foo/bar"
         # print(context.exception)
-        self.assertEquals("Invalid value for metadata_dir: path should not be absolute: /foo/bar",
+        self.assertEqual("Invalid value for metadata_dir: path should not be absolute: /foo/bar",
                               context.exception.args[0])
-        self.assertIsInstance(context.exception, ValueError)
 
         # cannot check if metadata_dir will be a directory, because relative to resource_dir
         # this = os.path.basename(__file__)
@@ -121,211 +135,175 @@ class TestRsParameters(unittest.TestCase):
         self.save_configuration_test(rsp)
 
     def test_description_dir(self):
+        cwd = os.getcwd()
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
         self.assertIsNone(rsp.description_dir)
 
         rsp.description_dir = "."
-        self.assertEquals(os.getcwd(), rsp.description_dir)
+        self.assertEqual(cwd, rsp.description_dir)
 
         # contamination test
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals(os.getcwd(), rsp2.description_dir)
+        rsp2 = self.assert_clone(rsp)
+        self.assertEqual(cwd, rsp2.description_dir)
 
-        with self.assertRaises(Exception) as context:
+        with self.assertRaises(ValueError) as context:
             rsp.description_dir = "/foo/bar"
         #print(context.exception)
-        self.assertIsInstance(context.exception, ValueError)
 
-        self.assertEquals(os.getcwd(), rsp.description_dir)
+        self.assertEqual(cwd, rsp.description_dir)
         self.save_configuration_test(rsp)
 
     def test_url_prefix(self):
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEquals(rsp.url_prefix, "http://www.example.com/")
+        self.assertEqual(rsp.url_prefix, "http://www.example.com/")
 
         rsp = RsParameters(url_prefix="http://foo.bar.com")
-        self.assertEquals(rsp.url_prefix, "http://foo.bar.com/")
+        self.assertEqual(rsp.url_prefix, "http://foo.bar.com/")
 
         # contamination test
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals(rsp2.url_prefix, "http://foo.bar.com/")
-
-        with self.assertRaises(Exception) as context:
-            rsp.url_prefix = "nix://foo.bar.com"
-        #print(context.exception)
-        self.assertEquals("URL schemes allowed are 'http' or 'https'. Given: 'nix://foo.bar.com'", context.exception.args[0])
-        self.assertIsInstance(context.exception, ValueError)
-
-        with self.assertRaises(Exception) as context:
-            rsp.url_prefix = "https://.nl"
-        #print(context.exception)
-        self.assertEquals("URL has invalid domain name: '.nl'. Given: 'https://.nl'", context.exception.args[0])
-        self.assertIsInstance(context.exception, ValueError)
-
-        with self.assertRaises(Exception) as context:
-            rsp.url_prefix = "https://foo.bar.com#foo"
-        #print(context.exception)
-        self.assertEquals("URL should not have a fragment. Given: 'https://foo.bar.com#foo'", context.exception.args[0])
-        self.assertIsInstance(context.exception, ValueError)
-
-        with self.assertRaises(Exception) as context:
-            rsp.url_prefix = "http://foo.bar.com?what=this"
-        #print(context.exception)
-        self.assertEquals("URL should not have a query string. Given: 'http://foo.bar.com?what=this'", context.exception.args[0])
-        self.assertIsInstance(context.exception, ValueError)
-
-        with self.assertRaises(Exception) as context:
-            rsp.url_prefix = "http://foo.bar.com/fragment#is"
-        #print(context.exception)
-        self.assertEquals("URL should not have a fragment. Given: 'http://foo.bar.com/fragment#is'", context.exception.args[0])
-        self.assertIsInstance(context.exception, ValueError)
-
-        with self.assertRaises(Exception) as context:
-            rsp.url_prefix = "http://foo.bar.com/ uhr.isrong"
-        #print(context.exception)
-        self.assertEquals("URL is invalid. Given: 'http://foo.bar.com/ uhr.isrong'", context.exception.args[0])
-        self.assertIsInstance(context.exception, ValueError)
+        rsp2 = self.assert_clone(rsp)
+        self.assertEqual(rsp2.url_prefix, "http://foo.bar.com/")
+
+        bad_urls = [
+            ("nix://foo.bar.com", "URL schemes allowed are 'http' or 'https'. Given: 'nix://foo.bar.com'"),
+            ("https://.nl", "URL has invalid domain name: '.nl'. Given: 'https://.nl'"),
+            ("https://foo.bar.com#foo", "URL should not have a fragment. Given: 'https://foo.bar.com#foo'"),
+            ("http://foo.bar.com?what=this", "URL should not have a query string. Given: 'http://foo.bar.com?what=this'"),
+            ("http://foo.bar.com/fragment#is", "URL should not have a fragment. Given: 'http://foo.bar.com/fragment#is'"),
+            ("http://foo.bar.com/ uhr.isrong", "URL is invalid. Given: 'http://foo.bar.com/ uhr.isrong'"),
+        ]
+        for bad_url, msg in bad_urls:
+            with self.subTest(url=bad_url):
+                with self.assertRaises(ValueError) as context:
+                    rsp.url_prefix = bad_url
+                self.assertEqual(msg, context.exception.args[0])
+                self.assertEqual(rsp.url_prefix, "http://foo.bar.com/")
 
         self.save_configuration_test(rsp)
 
     def test_strategy(self):
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEquals(Strategy.resourcelist, rsp.strategy)
+        self.assertEqual(Strategy.resourcelist, rsp.strategy)
 
         rsp = RsParameters(strategy=Strategy.inc_changelist)
-        self.assertEquals(Strategy.inc_changelist, rsp.strategy)
+        self.assertEqual(Strategy.inc_changelist, rsp.strategy)
 
         # contamination test
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals(rsp2.strategy, Strategy.inc_changelist)
+        rsp2 = self.assert_clone(rsp)
+        self.assertEqual(rsp2.strategy, Strategy.inc_changelist)
 
         rsp = RsParameters(strategy=1)
-        self.assertEquals(Strategy.new_changelist, rsp.strategy)
+        self.assertEqual(Strategy.new_changelist, rsp.strategy)
 
         rsp = RsParameters(strategy="inc_changelist")
-        self.assertEquals(Strategy.inc_changelist, rsp.strategy)
+        self.assertEqual(Strategy.inc_changelist, rsp.strategy)
 
-        with self.assertRaises(Exception) as context:
+        with self.assertRaises(ValueError) as context:
             rsp.strategy = 20056
         #print(context.exception)
-        self.assertEquals("20056 is not a valid Strategy", context.exception.args[0])
-        self.assertIsInstance(context.exception, ValueError)
+        self.assertEqual("20056 is not a valid Strategy", context.exception.args[0])
 
         self.save_configuration_test(rsp)
 
     def test_history_dir(self):
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEquals(None, rsp.history_dir)
+        self.assertEqual(None, rsp.history_dir)
 
         rsp = RsParameters(history_dir="foo/bar/baz")
-        self.assertEquals("foo/bar/baz", rsp.history_dir)
+        self.assertEqual("foo/bar/baz", rsp.history_dir)
 
         # contamination test
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals("foo/bar/baz", rsp2.history_dir)
+        rsp2 = self.assert_clone(rsp)
+        self.assertEqual("foo/bar/baz", rsp2.history_dir)
 
         expected = os.path.join(rsp.abs_metadata_dir(), "foo/bar/baz")
-        self.assertEquals(expected, rsp.abs_history_dir())
+        self.assertEqual(expected, rsp.abs_history_dir())
 
         rsp.history_dir = None
         self.assertIsNone(rsp.abs_history_dir())
 
         rsp.history_dir = "history"
-        self.assertEquals("history", rsp.history_dir)
+        self.assertEqual("history", rsp.history_dir)
 
         rsp.history_dir = ""
-        self.assertEquals(None, rsp.history_dir)
+        self.assertEqual(None, rsp.history_dir)
 
-        with self.assertRaises(Exception) as context:
+        with self.assertRaises(ValueError) as context:
             rsp.history_dir = 42
         #print(context.exception)
-        self.assertEquals("Value for history_dir should be string. 42 is <class 'int'>", context.exception.args[0])
-        self.assertIsInstance(context.exception, ValueError)
+        self.assertEqual("Value for history_dir should be string. 42 is <class 'int'>", context.exception.args[0])
 
         self.save_configuration_test(rsp)
 
     def test_plugin_dir(self):
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEquals(None, rsp.plugin_dir)
+        self.assertEqual(None, rsp.plugin_dir)
 
-        user_home = os.path.expanduser("~")
+        user_home = _USER_HOME
         rsp.plugin_dir = user_home
-        self.assertEquals(user_home, rsp.plugin_dir)
+        self.assertEqual(user_home, rsp.plugin_dir)
 
         # contamination test
         rsp.plugin_dir = None
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals(None, rsp2.plugin_dir)
+        rsp2 = self.assert_clone(rsp)
+        self.assertEqual(None, rsp2.plugin_dir)
 
         rsp.plugin_dir = user_home
-        rsp3 = RsParameters(**rsp.__dict__)
-        self.assertEquals(user_home, rsp3.plugin_dir)
+        rsp3 = self.assert_clone(rsp)
+        self.assertEqual(user_home, rsp3.plugin_dir)
 
         self.save_configuration_test(rsp)
 
     def test_max_items_in_list(self):
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEquals(50000, rsp.max_items_in_list)
+        self.assertEqual(50000, rsp.max_items_in_list)
 
         rsp = RsParameters(max_items_in_list=1)
-        self.assertEquals(1, rsp.max_items_in_list)
+        self.assertEqual(1, rsp.max_items_in_list)
 
         # contamination test
         rsp.max_items_in_list = 12345
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals(12345, rsp2.max_items_in_list)
-
-        with self.assertRaises(Exception) as context:
-            rsp.max_items_in_list = "foo"
-        #print(context.exception)
-        self.assertEquals("Invalid value for max_items_in_list: not a number foo", context.exception.args[0])
-        self.assertIsInstance(context.exception, ValueError)
-
-        with self.assertRaises(Exception) as context:
-            rsp.max_items_in_list = 0
-        #print(context.exception)
-        self.assertEquals("Invalid value for max_items_in_list: value should be between 1 and 50000", context.exception.args[0])
-        self.assertIsInstance(context.exception, ValueError)
-
-        with self.assertRaises(Exception) as context:
-            rsp.max_items_in_list = 50001
-        #print(context.exception)
-        self.assertEquals("Invalid value for max_items_in_list: value should be between 1 and 50000", context.exception.args[0])
-        self.assertIsInstance(context.exception, ValueError)
+        rsp2 = self.assert_clone(rsp)
+        self.assertEqual(12345, rsp2.max_items_in_list)
+
+        out_of_range = "Invalid value for max_items_in_list: value should be between 1 and 50000"
+        bad_values = [
+            ("foo", "Invalid value for max_items_in_list: not a number foo"),
+            (0, out_of_range),
+            (50001, out_of_range),
+        ]
+        for bad_value, msg in bad_values:
+            with self.subTest(value=bad_value):
+                with self.assertRaises(ValueError) as context:
+                    rsp.max_items_in_list = bad_value
+                self.assertEqual(msg, context.exception.args[0])
+                self.assertEqual(12345, rsp.max_items_in_list)
 
         self.save_configuration_test(rsp)
 
     def test_zero_fill_filename(self):
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEquals(4, rsp.zero_fill_filename)
+        self.assertEqual(4, rsp.zero_fill_filename)
 
         rsp = RsParameters(zero_fill_filename=10)
-        self.assertEquals(10, rsp.zero_fill_filename)
+        self.assertEqual(10, rsp.zero_fill_filename)
 
         # contamination test
         rsp.zero_fill_filename = 8
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals(8, rsp2.zero_fill_filename)
+        rsp2 = self.assert_clone(rsp)
+        self.assertEqual(8, rsp2.zero_fill_filename)
 
         self.save_configuration_test(rsp)
 
     def test_booleans(self):
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
         self.assertTrue(rsp.is_saving_pretty_xml)
         self.assertTrue(rsp.is_saving_sitemaps)
@@ -337,7 +315,7 @@ class TestRsParameters(unittest.TestCase):
         self.assertFalse(rsp.has_wellknown_at_root)
 
         # contamination test
-        rsp2 = RsParameters(**rsp.__dict__)
+        rsp2 = self.assert_clone(rsp)
         self.assertFalse(rsp2.is_saving_pretty_xml)
         self.assertFalse(rsp2.is_saving_sitemaps)
         self.assertFalse(rsp2.has_wellknown_at_root)
@@ -345,177 +323,127 @@ class TestRsParameters(unittest.TestCase):
         self.save_configuration_test(rsp)
 
     def test_last_strategy(self):
-        Configuration().core_clear()
         rsp = RsParameters()
 
         self.assertIsNone(rsp.last_strategy)
 
         rsp.last_strategy = Strategy.inc_changelist
-        rsp2 = RsParameters(**rsp.__dict__)
+        rsp2 = self.assert_clone(rsp)
         self.assertEqual(Strategy.inc_changelist, rsp2.last_strategy)
 
         self.save_configuration_test(rsp)
 
-    def test_exp_scp_server(self):
-        # defaults to configuration defaults
-        Configuration().core_clear()
-        rsp = RsParameters()
-        self.assertEquals("example.com", rsp.exp_scp_server)
-
-        # contamination test
-        rsp.exp_scp_server = "server.name.com"
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals("server.name.com", rsp2.exp_scp_server)
-
-        rsp.exp_scp_server = "server.name.nl"
-        rsp3 = RsParameters(**rsp.__dict__)
-        self.assertEquals("server.name.nl", rsp3.exp_scp_server)
-
-        self.save_configuration_test(rsp)
-
-    def test_exp_scp_port(self):
-        # defaults to configuration defaults
-        Configuration().core_clear()
-        rsp = RsParameters()
-        self.assertEquals(22, rsp.exp_scp_port)
-
-        # contamination test
-        rsp.exp_scp_port = 2222
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals(2222, rsp2.exp_scp_port)
-
-        rsp.exp_scp_port = 1234
-        rsp3 = RsParameters(**rsp.__dict__)
-        self.assertEquals(1234, rsp3.exp_scp_port)
-
-        self.save_configuration_test(rsp)
-
-    def test_exp_scp_user(self):
-        # defaults to configuration defaults
-        Configuration().core_clear()
-        rsp = RsParameters()
-        self.assertEquals("username", rsp.exp_scp_user)
-
-        # contamination test
-        rsp.exp_scp_user = "jan"
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals("jan", rsp2.exp_scp_user)
-
-        rsp.exp_scp_user = "wim"
-        rsp3 = RsParameters(**rsp.__dict__)
-        self.assertEquals("wim", rsp3.exp_scp_user)
-
-        self.save_configuration_test(rsp)
-
-    def test_exp_scp_document_root(self):
-        # defaults to configuration defaults
-        Configuration().core_clear()
-        rsp = RsParameters()
-        self.assertEquals("/var/www/html", rsp.exp_scp_document_root)
-
-        # contamination test
-        rsp.exp_scp_document_root = "/opt/rs/"
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals("/opt/rs", rsp2.exp_scp_document_root)
-
-        rsp.exp_scp_document_root = "/var/www/html/ehri/rs"
-        rsp3 = RsParameters(**rsp.__dict__)
-        self.assertEquals("/var/www/html/ehri/rs", rsp3.exp_scp_document_root)
-
-        self.save_configuration_test(rsp)
+    def test_exp_scp_parameters(self):
+        # (parameter, configuration default, [(value, expected), ...])
+        cases = [
+            ("exp_scp_server", "example.com", [("server.name.com", "server.name.com"),
+                                               ("server.name.nl", "server.name.nl")]),
+            ("exp_scp_port", 22, [(2222, 2222), (1234, 1234)]),
+            ("exp_scp_user", "username", [("jan", "jan"), ("wim", "wim")]),
+            ("exp_scp_document_root", "/var/www/html", [("/opt/rs/", "/opt/rs"),
+                                                        ("/var/www/html/ehri/rs", "/var/www/html/ehri/rs")]),
+        ]
+        for name, default, values in cases:
+            with self.subTest(parameter=name):
+                # defaults to configuration defaults
+                Configuration().core_clear()
+                rsp = RsParameters()
+                self.assertEqual(default, getattr(rsp, name))
+
+                # contamination test
+                for value, expected in values:
+                    setattr(rsp, name, value)
+                    rsp2 = self.assert_clone(rsp)
+                    self.assertEqual(expected, getattr(rsp2, name))
+
+                self.save_configuration_test(rsp)
 
     def test_imp_scp_server(self):
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEquals("example.com", rsp.imp_scp_server)
+        self.assertEqual("example.com", rsp.imp_scp_server)
 
         # contamination test
         rsp.imp_scp_server = "imp.server.name.com"
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals("imp.server.name.com", rsp2.imp_scp_server)
+        rsp2 = self.assert_clone(rsp)
+        self.assertEqual("imp.server.name.com", rsp2.imp_scp_server)
 
         rsp.imp_scp_server = "imp.server.name.nl"
-        rsp3 = RsParameters(**rsp.__dict__)
-        self.assertEquals("imp.server.name.nl", rsp3.imp_scp_server)
+        rsp3 = self.assert_clone(rsp)
+        self.assertEqual("imp.server.name.nl", rsp3.imp_scp_server)
 
         self.save_configuration_test(rsp)
 
     def test_imp_scp_port(self):
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEquals(22, rsp.imp_scp_port)
+        self.assertEqual(22, rsp.imp_scp_port)
 
         # contamination test
         rsp.imp_scp_port = 2222
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals(2222, rsp2.imp_scp_port)
+        rsp2 = self.assert_clone(rsp)
+        self.assertEqual(2222, rsp2.imp_scp_port)
 
         rsp.imp_scp_port = 1234
-        rsp3 = RsParameters(**rsp.__dict__)
-        self.assertEquals(1234, rsp3.imp_scp_port)
+        rsp3 = self.assert_clone(rsp)
+        self.assertEqual(1234, rsp3.imp_scp_port)
 
         self.save_configuration_test(rsp)
 
     def test_imp_scp_user(self):
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEquals("username", rsp.imp_scp_user)
+        self.assertEqual("username", rsp.imp_scp_user)
 
         # contamination test
         rsp.imp_scp_user = "kees"
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals("kees", rsp2.imp_scp_user)
+        rsp2 = self.assert_clone(rsp)
+        self.assertEqual("kees", rsp2.imp_scp_user)
 
         rsp.imp_scp_user = "joe"
-        rsp3 = RsParameters(**rsp.__dict__)
-        self.assertEquals("joe", rsp3.imp_scp_user)
+        rsp3 = self.assert_clone(rsp)
+        self.assertEqual("joe", rsp3.imp_scp_user)
 
         self.save_configuration_test(rsp)
 
     def test_imp_scp_remote_path(self):
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEquals("~", rsp.imp_scp_remote_path)
+        self.assertEqual("~", rsp.imp_scp_remote_path)
 
         # contamination test
         rsp.imp_scp_remote_path = "/var/rs/"
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals("/var/rs", rsp2.imp_scp_remote_path)
+        rsp2 = self.assert_clone(rsp)
+        self.assertEqual("/var/rs", rsp2.imp_scp_remote_path)
 
         rsp.imp_scp_remote_path = "/opt/ehri/rs"
-        rsp3 = RsParameters(**rsp.__dict__)
-        self.assertEquals("/opt/ehri/rs", rsp3.imp_scp_remote_path)
+        rsp3 = self.assert_clone(rsp)
+        self.assertEqual("/opt/ehri/rs", rsp3.imp_scp_remote_path)
 
         self.save_configuration_test(rsp)
 
     def test_imp_scp_local_path(self):
         # defaults to configuration defaults
-        user_home = os.path.expanduser("~")
+        user_home = _USER_HOME
 
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEquals(user_home, rsp.imp_scp_local_path)
+        self.assertEqual(user_home, rsp.imp_scp_local_path)
 
         # contamination test
         rsp.imp_scp_local_path = os.path.join(user_home, "local", "rs")
-        rsp2 = RsParameters(**rsp.__dict__)
-        self.assertEquals(os.path.join(user_home, "local", "rs"), rsp2.imp_scp_local_path)
+        rsp2 = self.assert_clone(rsp)
+        self.assertEqual(os.path.join(user_home, "local", "rs"), rsp2.imp_scp_local_path)
 
         rsp.imp_scp_local_path = os.path.join(user_home, "rs", "local")
-        rsp3 = RsParameters(**rsp.__dict__)
-        self.assertEquals(os.path.join(user_home, "rs", "local"), rsp3.imp_scp_local_path)
+        rsp3 = self.assert_clone(rsp)
+        self.assertEqual(os.path.join(user_home, "rs", "local"), rsp3.imp_scp_local_path)
 
         self.save_configuration_test(rsp)
 
     def test_zip_filename(self):
         # defaults to configuration defaults
-        Configuration().core_clear()
         rsp = RsParameters()
-        self.assertEqual(os.path.join(os.path.expanduser("~"), "resourcesync.zip"), rsp.zip_filename)
+        self.assertEqual(os.path.join(_USER_HOME, "resourcesync.zip"), rsp.zip_filename)
 
         rsp.zip_filename = "bar"
         self.assertEqual("bar.zip", rsp.zip_filename)
@@ -528,47 +456,89 @@ class TestRsParameters(unittest.TestCase):
 
         # contamination test
         rsp.zip_filename = "/foo/bar.zip"
-        rsp2 = RsParameters(**rsp.__dict__)
+        rsp2 = self.assert_clone(rsp)
         self.assertEqual("/foo/bar.zip", rsp2.zip_filename)
 
         self.save_configuration_test(rsp)
 
 
+    def assert_clone(self, rsp):
+        # contamination test: a clone has the same values, but no shared mutable values
+        rsp2 = RsParameters(**rsp.__dict__)
+        self.assertDictEqual(rsp.__dict__, rsp2.__dict__)
+        self.assert_no_shared_mutables(rsp, rsp2)
+        return rsp2
+
+    def assert_no_shared_mutables(self, rsp, rsp2):
+        for key, value in rsp.__dict__.items():
+            if isinstance(value, (list, dict, set)):
+                self.assertIsNot(value, rsp2.__dict__[key], key)
+
     def save_configuration_test(self, rsp):
         Configuration.reset()
         rsp.save_configuration()
         Configuration.reset()
 
         rsp2 = RsParameters()
-        self.assertEquals(rsp.__dict__, rsp2.__dict__)
+        self.assertEqual(rsp.__dict__, rsp2.__dict__)
 
     def test_server_root(self):
         rsp = RsParameters(url_prefix="http://example.com/bla/foo/bar")
-        self.assertEquals(rsp.server_root(), "http://example.com")
+        self.assertEqual(rsp.server_root(), "http://example.com")
 
         rsp.url_prefix = "http://www.example.com"
-        self.assertEquals(rsp.server_root(), "http://www.example.com")
+        self.assertEqual(rsp.server_root(), "http://www.example.com")
 
     def test_server_path(self):
         rsp = RsParameters(url_prefix="http://example.com/bla/foo/bar")
-        self.assertEquals("http://example.com/bla/foo/bar/", rsp.url_prefix)
-        self.assertEquals("/bla/foo/bar/", rsp.server_path())
+        self.assertEqual("http://example.com/bla/foo/bar/", rsp.url_prefix)
+        self.assertEqual("/bla/foo/bar/", rsp.server_path())
 
         rsp.url_prefix = "http://www.example.com"
-        self.assertEquals("http://www.example.com/", rsp.url_prefix)
-        self.assertEquals("/", rsp.server_path())
+        self.assertEqual("http://www.example.com/", rsp.url_prefix)
+        self.assertEqual("/", rsp.server_path())
 
     def test_current_description_url(self):
         rsp = RsParameters(url_prefix="http://example.com/bla/foo/bar")
         rsp.has_wellknown_at_root = True
-        self.assertEquals(rsp.description_url(), "http://example.com/.well-known/resourcesync")
+        self.assertEqual(rsp.description_url(), "http://example.com/.well-known/resourcesync")
 
         rsp.has_wellknown_at_root = False
-        rsp.resource_dir = os.path.expanduser("~")
+        rsp.resource_dir = _USER_HOME
         rsp.metadata_dir = "some/path/md10"
-        self.assertEquals(rsp.description_url(),
+        self.assertEqual(rsp.description_url(),
                           "http://example.com/bla/foo/bar/some/path/md10/.well-known/resourcesync")
 
+    def test_uri_from_path(self):
+        user_home = _USER_HOME
+        rsp = RsParameters(resource_dir=user_home, url_prefix="http://example.com/bla")
+        path = os.path.join(user_home, "foo", "bar baz.txt")
+        self.assertEqual("http://example.com/bla/foo/bar%20baz.txt", rsp.uri_from_path(path))
+
+        path = os.path.join(os.path.dirname(user_home), "foo.txt")
+        self.assertEqual("http://example.com/bla/../foo.txt", rsp.uri_from_path(path))
+
+        # paths that are not normalized give the urls of their normalized paths
+        for path, expected in [(os.path.join(user_home, "a", "..", "b.txt"), "http://example.com/bla/b.txt"),
+                               (os.path.join(user_home, "a") + os.sep * 2 + "b.txt", "http://example.com/bla/a/b.txt"),
+                               (os.path.join(user_home, ".", "c.txt"), "http://example.com/bla/c.txt"),
+                               (os.path.join(user_home, "d") + os.sep, "http://example.com/bla/d")]:
+            self.assertEqual(expected, rsp.uri_from_path(path), path)
+            rel_path = os.path.relpath(path, user_home)
+            self.assertEqual(rsp.url_prefix + defaults.sanitize_url_path(rel_path), rsp.uri_from_path(path))
+
+    def test_trusted_copy(self):
+        rsp = RsParameters(url_prefix="http://example.com/bla", max_items_in_list=42, has_wellknown_at_root=False)
+        rsp2 = RsParameters._trusted_copy(rsp)
+        self.assertIsNot(rsp, rsp2)
+        self.assertEqual(rsp.__dict__, rsp2.__dict__)
+        self.assert_no_shared_mutables(rsp, rsp2)
+        self.assertEqual(RsParameters(**rsp.__dict__).__dict__, rsp2.__dict__)
+        self.assertEqual(rsp.description_url(), rsp2.description_url())
+
+        rsp2.max_items_in_list = 43
+        self.assertEqual(42, rsp.max_items_in_list)
+
     @unittest.skip
     def test_describe(self):
         rsp = RsParameters()
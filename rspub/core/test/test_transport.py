@@ -1,26 +1,34 @@
 #! /usr/bin/env python3
 # -*- coding: utf-8 -*-
+import functools
 import os
+import shutil
+import tempfile
 import unittest
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 
 import logging
 
-import sys
-
 import time
+from unittest import mock
+
+from resync import Resource, ResourceList
 
 from rspub.core.rs_paras import RsParameters
-from rspub.core.transport import Transport
+from rspub.core.transport import Transport, TransportEvent
 
 # test expects a configuration file with one line of text:
 #       server,port,user,password,document_root,document_path
 # password can be fake if key-based authentication is enabled.
 # see: https://www.digitalocean.com/community/tutorials/how-to-configure-ssh-key-based-authentication-on-a-linux-server
-from rspub.util.observe import EventLogger
+from rspub.util.observe import EventLogger, ObserverInterruptException
+from rspub.core.test._log_setup import configure_once
 
 CFG_FILE = "src/sender_test_on_zandbak.cfg"
 
 
+@functools.lru_cache(maxsize=2)
 def precondition_remote_server_config(as_string=False):
     msg = "Ok"
     cfg_file = os.path.join(os.path.expanduser("~"), CFG_FILE)
@@ -36,14 +44,7 @@ def precondition_remote_server_config(as_string=False):
 class TestTransport(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        # logging:
-        root = logging.getLogger()
-        root.setLevel(logging.DEBUG)
-        ch = logging.StreamHandler(sys.stdout)
-        ch.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s')
-        ch.setFormatter(formatter)
-        root.addHandler(ch)
+        configure_once()
 
     def test_extract_paths(self):
         paras = RsParameters(config_name="DEFAULT")
@@ -71,6 +72,14 @@ class TestTransport(unittest.TestCase):
         # if used with key-based authentication than 'password' is ignored
         trans.scp_resources(password=password, all_resources=False)
 
+    @unittest.skipUnless(precondition_remote_server_config(), precondition_remote_server_config(as_string=True))
+    def test_sftp_resources(self):
+        paras, password = self.read_parameters()
+        trans = Transport(paras)
+        trans.register(EventLogger(logging_level=logging.INFO))
+        trans.sftp_resources(password=password, all_resources=False)
+        self.assertEqual(0, trans.count_errors)
+
     @unittest.skip
     #@unittest.skipUnless(precondition_remote_server_config(), precondition_remote_server_config(as_string=True))
     def test_scp_put(self):
@@ -98,5 +107,264 @@ class TestTransport(unittest.TestCase):
         return paras, password
 
 
+class _LocalSftp(object):
+    # stands in for paramiko's SFTPClient, with remote paths on the local file system
+
+    def __init__(self, missing_remote=None):
+        self.missing_remote = missing_remote
+        self.closed = False
+
+    def stat(self, path):
+        return os.stat(path)
+
+    def mkdir(self, path):
+        os.mkdir(path)
+
+    def putfo(self, fl, remotepath, file_size=0, callback=None, confirm=True):
+        if remotepath == self.missing_remote:
+            raise FileNotFoundError(2, "No such file")
+        with open(remotepath, "wb") as file:
+            shutil.copyfileobj(fl, file)
+        callback(file_size, file_size)
+
+    def close(self):
+        self.closed = True
+
+
+class TestCopyResources(unittest.TestCase):
+
+    relpaths = ["doc_%d.txt" % i for i in range(50)] + ["sub/doc_%d.txt" % i for i in range(50)]
+
+    def create_resources(self, resource_dir, **kwargs):
+        paras = RsParameters(resource_dir=resource_dir, metadata_dir="metadata", url_prefix="http://example.com/",
+                             **kwargs)
+        rl = ResourceList()
+        for relpath in self.relpaths:
+            filename = os.path.join(resource_dir, relpath)
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with open(filename, "w") as file:
+                file.write(relpath)
+            rl.add(Resource("http://example.com/" + relpath))
+        os.makedirs(paras.abs_metadata_dir())
+        with open(paras.abs_metadata_path("resourcelist_0000.xml"), "w", encoding="utf-8") as file:
+            file.write(rl.as_xml())
+        return paras
+
+    def test_handle_resources(self):
+        with tempfile.TemporaryDirectory() as resource_dir:
+            paras = self.create_resources(resource_dir)
+
+            copied = []
+            staging_dirs = []
+
+            def function(tmpdirname):
+                staging_dirs.append(os.path.dirname(tmpdirname))
+                copied.extend(os.path.relpath(os.path.join(root, name), tmpdirname)
+                              for root, dirs, files in os.walk(tmpdirname) for name in files)
+
+            trans = Transport(paras)
+            trans.handle_resources(function, all_resources=True, include_description=False, staging_dir=resource_dir)
+
+            self.assertEqual([resource_dir], staging_dirs)
+
+            self.assertEqual(len(self.relpaths), trans.count_resources)
+            self.assertEqual(sorted(self.relpaths + ["metadata/resourcelist_0000.xml"]), sorted(copied))
+
+    def test_handle_resources_duplicate_uri(self):
+        with tempfile.TemporaryDirectory() as resource_dir:
+            paras = self.create_resources(resource_dir)
+            # the same resources listed again in a second resourcelist
+            shutil.copyfile(paras.abs_metadata_path("resourcelist_0000.xml"),
+                            paras.abs_metadata_path("resourcelist_0001.xml"))
+
+            trans = Transport(paras)
+            trans.handle_resources(lambda tmpdirname: None, all_resources=True, include_description=False,
+                                   staging_dir=resource_dir)
+
+            self.assertEqual(len(self.relpaths), trans.count_resources)
+            self.assertEqual(0, trans.count_errors)
+
+    def test_zip_resources(self):
+        with tempfile.TemporaryDirectory() as resource_dir:
+            zip_filename = os.path.join(resource_dir, "zip", "resources.zip")
+            paras = self.create_resources(resource_dir, zip_filename=zip_filename)
+            os.makedirs(os.path.dirname(paras.abs_description_path()))
+            with open(paras.abs_description_path(), "w") as file:
+                file.write("description")
+
+            trans = Transport(paras)
+            trans.zip_resources(all_resources=True)
+
+            self.assertEqual(len(self.relpaths), trans.count_resources)
+            self.assertEqual(0, trans.count_errors)
+            with zipfile.ZipFile(zip_filename) as zf:
+                self.assertEqual(sorted(self.relpaths + ["metadata/resourcelist_0000.xml",
+                                                         ".well-known/resourcesync"]), sorted(zf.namelist()))
+                self.assertEqual(b"sub/doc_1.txt", zf.read("sub/doc_1.txt"))
+            self.assertFalse(os.path.exists(zip_filename + ".tmp"))
+
+    def test_zip_resources_relative_filename(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as resource_dir:
+            paras = self.create_resources(resource_dir, zip_filename="resources.zip")
+            os.chdir(resource_dir)
+            try:
+                trans = Transport(paras)
+                trans.zip_resources(all_resources=True)
+            finally:
+                os.chdir(cwd)
+            self.assertTrue(os.path.isfile(os.path.join(resource_dir, "resources.zip")))
+
+    def test_compress_type(self):
+        self.assertEqual(zipfile.ZIP_DEFLATED, Transport._compress_type("/data/resourcelist_0000.xml"))
+        self.assertEqual(zipfile.ZIP_DEFLATED, Transport._compress_type("/data/no_extension"))
+        self.assertEqual(zipfile.ZIP_STORED, Transport._compress_type("/data/scan.JPG"))
+        self.assertEqual(zipfile.ZIP_STORED, Transport._compress_type("/data/archive.tar.gz"))
+
+    def test_copy_to(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            src = os.path.join(tmpdirname, "src.txt")
+            with open(src, "w") as file:
+                file.write("content")
+            for link in (True, False):
+                Transport._copy_to(os.path.join("dest", str(link)), src, tmpdirname, link=link)
+                dest = os.path.join(tmpdirname, "dest", str(link))
+                self.assertEqual(link, os.path.samefile(src, dest))
+                with open(dest) as file:
+                    self.assertEqual("content", file.read())
+
+    def test_copy_to_twice(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            src1 = os.path.join(tmpdirname, "src1.txt")
+            src2 = os.path.join(tmpdirname, "src2.txt")
+            for src in (src1, src2):
+                with open(src, "w") as file:
+                    file.write(src)
+            for link in (True, False):
+                relpath = os.path.join("dest", str(link))
+                dest = os.path.join(tmpdirname, relpath)
+                Transport._copy_to(relpath, src1, tmpdirname, link=link)
+                # same relpath staged twice, f.i. a uri listed in two resourcelists
+                Transport._copy_to(relpath, src1, tmpdirname, link=link)
+                Transport._copy_to(relpath, src2, tmpdirname, link=link)
+                with open(dest) as file:
+                    self.assertEqual(src2, file.read())
+                with open(src1) as file:
+                    self.assertEqual(src1, file.read())
+
+    def test_copy_to_concurrently(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            sources = [os.path.join(tmpdirname, "src_%d.txt" % i) for i in range(8)]
+            for src in sources:
+                with open(src, "w") as file:
+                    file.write(src * 1000)
+            for link in (True, False):
+                relpath = os.path.join("dest", str(link))
+                # distinct uris that unquote to the same relpath, staged by several threads
+                with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+                    for future in [executor.submit(Transport._copy_to, relpath, src, tmpdirname, link=link)
+                                   for src in sources * 4]:
+                        future.result()
+                with open(os.path.join(tmpdirname, relpath)) as file:
+                    self.assertIn(file.read(), [src * 1000 for src in sources])
+                for src in sources:
+                    with open(src) as file:
+                        self.assertEqual(src * 1000, file.read())
+
+    def test_handle_resources_events(self):
+        with tempfile.TemporaryDirectory() as resource_dir:
+            paras = self.create_resources(resource_dir)
+            events = []
+            trans = Transport(paras)
+            trans.register(mock.Mock(**{
+                "inform.side_effect": lambda *args, **kwargs: events.append((args[1], kwargs.get("file"))),
+                "confirm.side_effect": lambda *args, **kwargs: events.append((args[1], kwargs["filename"])) or True}))
+            trans.handle_resources(lambda tmpdirname: None, all_resources=True, include_description=False)
+
+            # every confirmation is followed by the event of the same resource
+            copies = [event for event in events
+                      if event[0] in (TransportEvent.copy_file, TransportEvent.copy_resource)][:2 * len(self.relpaths)]
+            self.assertEqual([TransportEvent.copy_file, TransportEvent.copy_resource] * len(self.relpaths),
+                             [event for event, src in copies])
+            self.assertEqual([src for event, src in copies[0::2]], [src for event, src in copies[1::2]])
+
+    def test_handle_resources_interrupt(self):
+        with tempfile.TemporaryDirectory() as resource_dir:
+            paras = self.create_resources(resource_dir)
+            trans = Transport(paras)
+            confirmed = []
+            trans.register(mock.Mock(**{"confirm.side_effect": lambda *args, **kwargs:
+                                        confirmed.append(kwargs["filename"]) or len(confirmed) < 3}))
+            with self.assertRaises(ObserverInterruptException):
+                trans.handle_resources(lambda tmpdirname: None, all_resources=True, include_description=False)
+            self.assertEqual(2, trans.count_resources)
+
+    def test_copy_to_created_dirs(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            src = os.path.join(tmpdirname, "src.txt")
+            open(src, "w").close()
+            created_dirs = set()
+            Transport._copy_to("a/b/c/doc.txt", src, tmpdirname, created_dirs=created_dirs)
+            for relpath in ("a/b/c", "a/b", "a", ""):
+                self.assertIn(os.path.join(tmpdirname, relpath).rstrip(os.sep), created_dirs)
+            Transport._copy_to("a/b/doc.txt", src, tmpdirname, created_dirs=created_dirs)
+            self.assertTrue(os.path.isfile(os.path.join(tmpdirname, "a", "b", "doc.txt")))
+
+
+    def sftp_resources(self, resource_dir, remote_dir, sftp, missing_local=None):
+        paras = self.create_resources(resource_dir)
+        if missing_local:
+            os.remove(os.path.join(resource_dir, missing_local))
+        paras.exp_scp_document_root = remote_dir
+        os.makedirs(os.path.dirname(paras.abs_description_path()))
+        with open(paras.abs_description_path(), "w") as file:
+            file.write("description")
+
+        events = []
+        trans = Transport(paras)
+        trans.register(mock.Mock(**{"inform.side_effect": lambda *args, **kwargs: events.append((args[1], kwargs)),
+                                    "confirm.return_value": True}))
+        trans.sshClient = mock.Mock()
+        trans.sshClient.open_sftp.return_value = sftp
+        trans.sftp_resources(all_resources=True)
+        return trans, events
+
+    def test_sftp_resources(self):
+        with tempfile.TemporaryDirectory() as resource_dir, tempfile.TemporaryDirectory() as remote_dir:
+            sftp = _LocalSftp()
+            trans, events = self.sftp_resources(resource_dir, remote_dir, sftp)
+
+            self.assertTrue(sftp.closed)
+            self.assertEqual(0, trans.count_errors)
+            self.assertEqual(len(self.relpaths), trans.count_resources)
+            self.assertEqual(2, trans.count_sitemaps)
+            self.assertEqual(len(self.relpaths) + 2, trans.count_transfers)
+            sent = sorted(os.path.relpath(os.path.join(root, name), remote_dir)
+                          for root, dirs, files in os.walk(remote_dir) for name in files)
+            self.assertEqual(sorted(self.relpaths + ["metadata/resourcelist_0000.xml", ".well-known/resourcesync"]),
+                             sent)
+            completed = [kwargs for event, kwargs in events if event == TransportEvent.scp_transfer_complete]
+            self.assertEqual(list(range(1, len(self.relpaths) + 3)), [kwargs["count_transfers"] for kwargs in completed])
+
+    def test_sftp_resources_remote_not_found(self):
+        with tempfile.TemporaryDirectory() as resource_dir, tempfile.TemporaryDirectory() as remote_dir:
+            sftp = _LocalSftp(missing_remote=os.path.join(remote_dir, "doc_0.txt"))
+            trans, events = self.sftp_resources(resource_dir, remote_dir, sftp)
+
+            # a remote error ends the transfer, it is not reported as a missing resource
+            self.assertTrue(sftp.closed)
+            self.assertEqual(1, trans.count_errors)
+            self.assertEqual(0, trans.count_transfers)
+            event_types = [event for event, kwargs in events]
+            self.assertNotIn(TransportEvent.resource_not_found, event_types)
+            self.assertIn(TransportEvent.scp_exception, event_types)
 
+    def test_sftp_resources_local_not_found(self):
+        with tempfile.TemporaryDirectory() as resource_dir, tempfile.TemporaryDirectory() as remote_dir:
+            trans, events = self.sftp_resources(resource_dir, remote_dir, _LocalSftp(), missing_local="doc_0.txt")
 
+            self.assertEqual(1, trans.count_errors)
+            self.assertEqual(len(self.relpaths) - 1, trans.count_resources)
+            self.assertEqual(len(self.relpaths) + 1, trans.count_transfers)
+            self.assertIn((TransportEvent.resource_not_found, {"file": os.path.join(resource_dir, "doc_0.txt")}),
+                          events)
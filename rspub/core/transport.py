@@ -4,27 +4,51 @@
 :samp:`Transport resources and sitemaps to the web server`
 
 """
+import collections
+import errno
+import fnmatch
+import functools
 import logging
 import os
+import posixpath
 import shutil
 import socket
 import tempfile
+import threading
 import urllib.parse
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from glob import glob
+from xml.etree.ElementTree import iterparse
 
-import paramiko
-from resync import ChangeList
-from resync import ResourceList
-from resync.list_base_with_index import ListBaseWithIndex
-from resync.sitemap import Sitemap
-from scp import SCPClient, SCPException
+from resync.resource import Resource
+from resync.sitemap import Sitemap, SITEMAP_NS
 
 from rspub.core.rs_paras import RsParameters
 from rspub.util.observe import Observable, ObserverInterruptException
 
 LOG = logging.getLogger(__name__)
 
+# number of threads copying resources to the temporary directory
+COPY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# errors of os.link on which a file is copied instead: linking not supported or not permitted
+LINK_FALLBACK_ERRNOS = frozenset({errno.EPERM, errno.EACCES, errno.EXDEV, errno.EMLINK, errno.ENOTSUP,
+                                  errno.EOPNOTSUPP})
+# environment variable naming the directory in which resources are staged for scp, f.i. a tmpfs
+STAGING_DIR_VARIABLE = "RSPUB_STAGING_DIR"
+# staging one destination is serialized by the lock at hash(destination) % len(STAGING_LOCKS)
+STAGING_LOCKS = tuple(threading.Lock() for _ in range(64))
+# size of the chunks scp reads from a file and sends over the channel
+SCP_BUFFER_SIZE = 1 << 20
+# seconds scp waits for the remote end; a larger chunk takes longer to drain on a slow link
+SCP_SOCKET_TIMEOUT = 30.0
+# seconds between keepalive packets on an idle ssh connection
+SSH_KEEPALIVE = 30
+# files that are compressed already; deflating them again costs cpu and gains next to nothing
+STORED_EXTENSIONS = frozenset({".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".jpg", ".jpeg", ".png", ".gif",
+                               ".webp", ".mp3", ".mp4", ".m4a", ".mov", ".avi", ".mkv", ".docx", ".xlsx", ".pptx",
+                               ".odt", ".ods", ".epub"})
+
 
 class TransportEvent(Enum):
     """
@@ -132,40 +156,74 @@ class ResourceAuditor(Observable):
         assert isinstance(paras, RsParameters)
         self.paras = paras
         self.count_errors = 0
+        # directory listings shared by the globs of one transport run; None outside a run
+        self._listdir_cache = None
+        self._url_prefix = None
+        self._url_base = None
 
     def all_resources(self):
-        all_resources = {}
-
-        # search for resourcelists
-        resourcelist_files = sorted(glob(self.paras.abs_metadata_path("resourcelist_*.xml")))
-        for rl_file_name in resourcelist_files:
-            resourcelist = ResourceList()
-            with open(rl_file_name, "r", encoding="utf-8") as rl_file:
-                sm = Sitemap()
-                sm.parse_xml(rl_file, resources=resourcelist)
-
-            all_resources.update({resource.uri: resource for resource in resourcelist.resources})
-
-        # search for changelists
-        changelist_files = sorted(glob(self.paras.abs_metadata_path("changelist_*.xml")))
-        for cl_file_name in changelist_files:
-            changelist = ChangeList()
-            with open(cl_file_name, "r", encoding="utf-8") as cl_file:
-                sm = Sitemap()
-                sm.parse_xml(cl_file, resources=changelist)
-
-            for resource in changelist.resources:
-                if resource.change == "created" or resource.change == "updated":
-                    all_resources.update({resource.uri: resource})
-                elif resource.change == "deleted" and resource.uri in all_resources:
-                    del all_resources[resource.uri]
-
-        return all_resources
+        return {resource.uri: resource for resource in self._iter_all_resources()}
+
+    def _iter_all_resources(self):
+        # yields the resources of all_resources, in the same order, without building the dict. Held in memory are
+        # the changelist resources, the set of listed uris and the last resource of uris that are listed more than
+        # once. Resourcelists are read twice, the first time only for their <loc>.
+        resourcelist_files = self._cached_glob(self.paras.abs_metadata_path("resourcelist_*.xml"))
+        changelist_files = self._cached_glob(self.paras.abs_metadata_path("changelist_*.xml"))
+        changes = [resource for file_name in changelist_files for resource in self._iter_resources(file_name)]
+
+        sm = Sitemap()
+        loc_tag = "{" + SITEMAP_NS + "}loc"
+        seen = set()
+        # uri -> last resource for uris listed more than once: first place, last value, as in a dict
+        duplicates = {}
+        for file_name in resourcelist_files:
+            for elem in self._iter_url_elements(file_name):
+                uri = elem.findtext(loc_tag)
+                if uri in seen:
+                    duplicates[uri] = sm.resource_from_etree(elem, Resource)
+                else:
+                    seen.add(uri)
+
+        # uri -> still at its place in the resourcelists
+        listed = {resource.uri: True for resource in changes if resource.uri in seen}
+        del seen
+        replaced = {}
+        # created after the resourcelists, in order of creation
+        appended = {}
+        for resource in changes:
+            uri = resource.uri
+            if resource.change == "created" or resource.change == "updated":
+                if listed.get(uri) and uri not in appended:
+                    replaced[uri] = resource
+                else:
+                    appended[uri] = resource
+            elif resource.change == "deleted":
+                if uri in appended:
+                    del appended[uri]
+                elif listed.get(uri):
+                    listed[uri] = False
+                    replaced.pop(uri, None)
+
+        yielded_duplicates = set()
+        for file_name in resourcelist_files:
+            for resource in self._iter_resources(file_name):
+                uri = resource.uri
+                if uri in duplicates:
+                    if uri in yielded_duplicates:
+                        continue
+                    yielded_duplicates.add(uri)
+                    resource = duplicates[uri]
+                if uri not in listed:
+                    yield resource
+                elif listed[uri]:
+                    yield replaced.get(uri, resource)
+        yield from appended.values()
 
     def all_resources_generator(self):
 
         def generator():
-            for resource in self.all_resources().values():
+            for resource in self._iter_all_resources():
                 path, relpath = self.extract_paths(resource.uri)
                 yield resource, path, relpath
 
@@ -175,12 +233,8 @@ class ResourceAuditor(Observable):
 
         def generator():
             for file_name in self.paras.last_sitemaps:
-                listbase = ListBaseWithIndex()
                 if os.path.exists(file_name):
-                    with open(file_name, "r", encoding="utf-8") as lb_file:
-                        sm = Sitemap()
-                        sm.parse_xml(lb_file, resources=listbase)
-                    for resource in listbase.resources:
+                    for resource in self._iter_resources(file_name):
                         if resource.change is None or not resource.change == "deleted":
                             path, relpath = self.extract_paths(resource.uri)
                             yield resource, path, relpath
@@ -191,9 +245,55 @@ class ResourceAuditor(Observable):
 
         return generator
 
+    def _cached_glob(self, pattern):
+        # sorted glob of the files in one directory; during a transport run the directory is listed only once
+        directory, name_pattern = os.path.split(pattern)
+        names = None if self._listdir_cache is None else self._listdir_cache.get(directory)
+        if names is None:
+            try:
+                names = self.__list_files(directory)
+            except OSError:
+                return []
+            if self._listdir_cache is not None:
+                self._listdir_cache[directory] = names
+        return [os.path.join(directory, name) for name in fnmatch.filter(names, name_pattern)]
+
+    @staticmethod
+    def __list_files(directory):
+        # like glob, names starting with '.' are skipped
+        with os.scandir(directory) as it:
+            return sorted(entry.name for entry in it if not entry.name.startswith(".") and entry.is_file())
+
+    @staticmethod
+    def _iter_resources(file_name):
+        sm = Sitemap()
+        for elem in ResourceAuditor._iter_url_elements(file_name):
+            yield sm.resource_from_etree(elem, Resource)
+
+    @staticmethod
+    def _iter_url_elements(file_name):
+        # streams the <url> elements of a sitemap instead of parsing the whole document into a tree:
+        # each element is cleared as soon as it has been handled.
+        url_tag = "{" + SITEMAP_NS + "}url"
+        root = None
+        for event, elem in iterparse(file_name, events=("start", "end")):
+            if root is None:
+                root = elem
+            elif event == "end" and elem.tag == url_tag:
+                yield elem
+                root.clear()
+
     def extract_paths(self, uri):
-        relpath = os.path.relpath(uri, self.paras.url_prefix)
-        relpath = urllib.parse.unquote(relpath)
+        url_prefix = self.paras.url_prefix
+        if url_prefix != self._url_prefix:
+            self._url_prefix = url_prefix
+            self._url_base = url_prefix.rstrip("/") + "/"
+        relpath = uri[len(self._url_base):] if uri.startswith(self._url_base) else ""
+        # os.path.relpath gives the same for a normalized path under url_prefix, but calls os.getcwd twice
+        if not relpath or relpath.startswith("/") or os.path.normpath(relpath) != relpath:
+            relpath = os.path.relpath(uri, url_prefix)
+        if "%" in relpath:
+            relpath = urllib.parse.unquote(relpath)
         path = os.path.join(self.paras.resource_dir, relpath)
 
         return path, relpath
@@ -213,48 +313,105 @@ class Transport(ResourceAuditor):
     def __init__(self, paras):
         ResourceAuditor.__init__(self, paras)
         self.sshClient = None
+        self.scpClient = None
         self.count_resources = 0
         self.count_sitemaps = 0
         self.count_transfers = 0
 
-    def handle_resources(self, function, all_resources=False, include_description=True):
+    def handle_resources(self, function, all_resources=False, include_description=True, staging_dir=None):
+        # staging_dir should hold a copy of all resources; by default RSPUB_STAGING_DIR or the system temp directory
+        if staging_dir is None:
+            staging_dir = os.environ.get(STAGING_DIR_VARIABLE) or None
         self.observers_inform(self, TransportEvent.start_copy_to_temp)
-        with tempfile.TemporaryDirectory(prefix="rspub.core.transport_") as tmpdirname:
+        with tempfile.TemporaryDirectory(prefix="rspub.core.transport_", dir=staging_dir) as tmpdirname:
             LOG.info("Created temporary directory: %s" % tmpdirname)
-            self.__copy_resources(tmpdirname, all_resources)
-            self.__copy_metadata(tmpdirname)
+            # on the same file system files are hard linked instead of copied
+            link = os.stat(tmpdirname).st_dev == os.stat(self.paras.resource_dir).st_dev
+            put = functools.partial(Transport._copy_to, tmpdirname=tmpdirname, link=link, created_dirs=set())
+            self.__copy_resources(put, all_resources)
+            self.__copy_metadata(put)
             if include_description:
-                self.__copy_description(tmpdirname)
+                self.__copy_description(put)
             function(tmpdirname)
 
-    def __copy_file(self, relpath, src, tmpdirname):
-        # LOG.debug("Copy file. relpath=%s src=%s" % (relpath, src))
+    def __confirm_copy(self, src):
         if not self.observers_confirm(self, TransportEvent.copy_file, filename=src):
             raise ObserverInterruptException("Process interrupted on TransportEvent.copy_file")
+
+    @staticmethod
+    def _copy_to(relpath, src, tmpdirname, link=False, created_dirs=None):
+        # created_dirs, if given, holds the directories known to exist
         dest = os.path.join(tmpdirname, relpath)
         dirs = os.path.dirname(dest)
-        os.makedirs(dirs, exist_ok=True)
-        shutil.copy2(src, dest)
-
-    def __copy_resources(self, tmpdirname, all_resources=False):
+        if created_dirs is None or dirs not in created_dirs:
+            os.makedirs(dirs, exist_ok=True)
+            if created_dirs is not None:
+                while dirs not in created_dirs:
+                    created_dirs.add(dirs)
+                    dirs = os.path.dirname(dirs)
+        # two uris may unquote to the same relpath; their copies must not run at the same time
+        with STAGING_LOCKS[hash(dest) % len(STAGING_LOCKS)]:
+            if link:
+                try:
+                    os.link(src, dest)
+                    return
+                except FileExistsError:
+                    if os.path.samefile(src, dest):
+                        # staged before
+                        return
+                    # staged before from another source: replace it, do not write through that hard link
+                    os.remove(dest)
+                except OSError as err:
+                    if err.errno not in LINK_FALLBACK_ERRNOS:
+                        raise
+            shutil.copy2(src, dest)
+
+    def __copy_resources(self, put, all_resources=False):
+        # files are copied by worker threads. Observers are only called from this thread, in resource order:
+        # the copy_file confirmation of a resource is directly followed by its copy_resource event.
+        # A copy may be done before it is confirmed; an interrupt cancels the copies that did not start.
         generator = self.get_generator(all_resources)
-        for resource, src, relpath in generator():
+        pending = collections.deque()
+        with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
             try:
-                self.__copy_file(relpath, src, tmpdirname)
-                self.count_resources += 1
-                self.observers_inform(self, TransportEvent.copy_resource, file=src,
-                                      count_resources=self.count_resources)
-            except FileNotFoundError:
-                LOG.exception("Unable to copy file %s", src)
-                self.count_errors += 1
-                self.observers_inform(self, ResourceAuditorEvent.resource_not_found, file=src)
+                for resource, src, relpath in generator():
+                    pending.append((src, executor.submit(put, relpath, src)))
+                    if len(pending) >= 4 * COPY_WORKERS:
+                        self.__collect_copy(*pending.popleft())
+                while pending:
+                    self.__collect_copy(*pending.popleft())
+            finally:
+                for src, future in pending:
+                    future.cancel()
+
+    def __collect_copy(self, src, future):
+        self.__confirm_copy(src)
+        self.__copied_resource(src, future.result)
+
+    def __put_resources(self, put, all_resources=False):
+        generator = self.get_generator(all_resources)
+        for resource, src, relpath in generator():
+            self.__confirm_copy(src)
+            self.__copied_resource(src, functools.partial(put, relpath, src))
+
+    def __copied_resource(self, src, copy):
+        try:
+            copy()
+            self.count_resources += 1
+            self.observers_inform(self, TransportEvent.copy_resource, file=src,
+                                  count_resources=self.count_resources)
+        except FileNotFoundError:
+            LOG.exception("Unable to copy file %s", src)
+            self.count_errors += 1
+            self.observers_inform(self, TransportEvent.resource_not_found, file=src)
 
-    def __copy_metadata(self, tmpdirname):
-        xml_files = glob(self.paras.abs_metadata_path("*.xml"))
+    def __copy_metadata(self, put):
+        xml_files = self._cached_glob(self.paras.abs_metadata_path("*.xml"))
         for xml_file in xml_files:
             relpath = os.path.relpath(xml_file, self.paras.resource_dir)
             try:
-                self.__copy_file(relpath, xml_file, tmpdirname)
+                self.__confirm_copy(xml_file)
+                put(relpath, xml_file)
                 self.count_sitemaps += 1
                 self.observers_inform(self, TransportEvent.copy_sitemap, file=xml_file,
                                       count_sitemaps=self.count_sitemaps)
@@ -263,19 +420,17 @@ class Transport(ResourceAuditor):
                 self.count_errors += 1
                 self.observers_inform(self, ResourceAuditorEvent.site_map_not_found, file=xml_file)
 
-    def __copy_description(self, tmpdirname):
+    def __copy_description(self, put):
         desc_file = self.paras.abs_description_path()
         self.count_sitemaps += 1
         if not self.paras.has_wellknown_at_root:
             # description goes in metadata_dir
-            dest = os.path.join(tmpdirname, self.paras.metadata_dir, ".well-known", "resourcesync")
+            relpath = os.path.join(self.paras.metadata_dir, ".well-known", "resourcesync")
         else:
             # description should go at server root. should be moved at server if not correct. keep 1 zip file.
-            dest = os.path.join(tmpdirname, ".well-known", "resourcesync")
-        dirs = os.path.dirname(dest)
-        os.makedirs(dirs, exist_ok=True)
+            relpath = os.path.join(".well-known", "resourcesync")
         try:
-            shutil.copy2(desc_file, dest)
+            put(relpath, desc_file)
             self.observers_inform(self, TransportEvent.copy_sitemap, file=desc_file,
                                   count_sitemaps=self.count_sitemaps)
         except FileNotFoundError:
@@ -294,22 +449,46 @@ class Transport(ResourceAuditor):
         self.__reset_counts()
         self.observers_inform(self, TransportEvent.transport_start, mode="zip sources", all_resources=all_resources)
         #
-        self.handle_resources(self.__function_zip, all_resources, include_description=True)
+        self._listdir_cache = {}
+        try:
+            self.__zip_direct(all_resources)
+        finally:
+            self._listdir_cache = None
         #
         self.observers_inform(self, TransportEvent.transport_end, mode="zip sources",
                               count_resources=self.count_resources, count_sitemaps=self.count_sitemaps,
                               count_transfers=self.count_transfers, count_errors=self.count_errors)
 
-    def __function_zip(self, tmpdirname):
-        if self.count_resources + self.count_sitemaps > 0:
-            zip_name = os.path.splitext(self.paras.zip_filename)[0]
-            zip_dir = os.path.dirname(self.paras.zip_filename)
+    @staticmethod
+    def _compress_type(filename):
+        if os.path.splitext(filename)[1].lower() in STORED_EXTENSIONS:
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+
+    def __zip_direct(self, all_resources=False):
+        # resources and sitemaps are written to the archive straight from their source, without a temporary copy
+        zip_filename = os.path.splitext(self.paras.zip_filename)[0] + ".zip"
+        zip_dir = os.path.dirname(self.paras.zip_filename)
+        if zip_dir:
             os.makedirs(zip_dir, exist_ok=True)
-            self.observers_inform(self, TransportEvent.zip_resources, zip_file=self.paras.zip_filename)
-            shutil.make_archive(zip_name, 'zip', tmpdirname)
-            LOG.info("Created zip archive: %s" % os.path.abspath(zip_name + ".zip"))
-        else:
-            LOG.info("Nothing to zip, not creating archive")
+        tmp_filename = zip_filename + ".tmp"
+        try:
+            with zipfile.ZipFile(tmp_filename, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+                def put(relpath, src):
+                    zf.write(src, arcname=relpath, compress_type=Transport._compress_type(src))
+
+                self.__put_resources(put, all_resources)
+                self.__copy_metadata(put)
+                self.__copy_description(put)
+            if self.count_resources + self.count_sitemaps > 0:
+                self.observers_inform(self, TransportEvent.zip_resources, zip_file=self.paras.zip_filename)
+                os.replace(tmp_filename, zip_filename)
+                LOG.info("Created zip archive: %s" % os.path.abspath(zip_filename))
+            else:
+                LOG.info("Nothing to zip, not creating archive")
+        finally:
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
 
     #############
     # Password may not be needed with key-based authentication. See fi:
@@ -319,6 +498,7 @@ class Transport(ResourceAuditor):
         self.observers_inform(self, TransportEvent.transport_start, mode="scp sources", all_resources=all_resources)
         self.create_ssh_client(password)
         #
+        self._listdir_cache = {}
         try:
             if self.sshClient:
                 if self.paras.has_wellknown_at_root:
@@ -335,6 +515,7 @@ class Transport(ResourceAuditor):
             self.count_errors += 1
             self.observers_inform(self, TransportEvent.scp_exception, exception=str(err))
         finally:
+            self._listdir_cache = None
             self.observers_inform(self, TransportEvent.transport_end, mode="scp sources",
                                   count_resources=self.count_resources, count_sitemaps=self.count_sitemaps,
                                   count_transfers=self.count_transfers, count_errors=self.count_errors)
@@ -355,18 +536,26 @@ class Transport(ResourceAuditor):
             self.observers_inform(self, ResourceAuditorEvent.site_map_not_found, file=files)
 
     def create_ssh_client(self, password):
+        if self.sshClient is not None and not self.__ssh_active():
+            # the connection of an earlier transport was dropped
+            self.close()
         if self.sshClient is None:
+            # paramiko is only needed when transferring with scp
+            import paramiko
             LOG.debug("Creating ssh client: server=%s, port=%d, user=%s" %
                       (self.paras.exp_scp_server, self.paras.exp_scp_port, self.paras.exp_scp_user))
             self.observers_inform(self, TransportEvent.ssh_client_creation,
                                   server=self.paras.exp_scp_server,
                                   port=self.paras.exp_scp_port,
                                   user=self.paras.exp_scp_user)
+            self.scpClient = None
             self.sshClient = paramiko.SSHClient()
             self.sshClient.load_system_host_keys()
             self.sshClient.set_missing_host_key_policy(paramiko.AutoAddPolicy())
             try:
                 self.sshClient.connect(self.paras.exp_scp_server, self.paras.exp_scp_port, self.paras.exp_scp_user, password)
+                # keep the connection open between transports
+                self.sshClient.get_transport().set_keepalive(SSH_KEEPALIVE)
             except paramiko.ssh_exception.AuthenticationException as err:
                 LOG.exception("Not authorized")
                 self.count_errors += 1
@@ -383,6 +572,19 @@ class Transport(ResourceAuditor):
                 self.observers_inform(self, TransportEvent.scp_exception, exception=str(err))
                 self.sshClient = None
 
+    def __ssh_active(self):
+        transport = self.sshClient.get_transport()
+        return transport is not None and transport.is_active()
+
+    # the ssh connection is kept open between transports of this instance until it is closed.
+    def close(self):
+        if self.scpClient is not None:
+            self.scpClient.close()
+            self.scpClient = None
+        if self.sshClient is not None:
+            self.sshClient.close()
+            self.sshClient = None
+
     def __function_scp(self, tmpdirname):
         if self.count_resources + self.count_sitemaps > 0:
             files = tmpdirname + os.sep
@@ -392,6 +594,80 @@ class Transport(ResourceAuditor):
         else:
             LOG.info("Nothing to send, not transferring with scp to remote")
 
+    #############
+    # Same as scp_resources, but every file is sent with sftp straight from its source,
+    # without first copying resources and sitemaps to a temporary directory.
+    def sftp_resources(self, all_resources=False, password="secret"):
+        self.__reset_counts()
+        self.observers_inform(self, TransportEvent.transport_start, mode="sftp sources", all_resources=all_resources)
+        self.create_ssh_client(password)
+        #
+        self._listdir_cache = {}
+        try:
+            if self.sshClient:
+                sftp = self.sshClient.open_sftp()
+                try:
+                    remote_path = self.paras.exp_scp_document_root + self.paras.server_path()
+                    put = functools.partial(self.__sftp_put, sftp, set(), remote_path)
+                    self.__put_resources(put, all_resources)
+                    self.__copy_metadata(put)
+                    if self.paras.has_wellknown_at_root:
+                        put = functools.partial(self.__sftp_put, sftp, set(), self.paras.exp_scp_document_root)
+                    self.__copy_description(put)
+                    LOG.info("Sent resources and metadata with sftp")
+                finally:
+                    sftp.close()
+        except Exception as err:
+            LOG.exception("Error while transfering files with sftp")
+            self.count_errors += 1
+            self.observers_inform(self, TransportEvent.scp_exception, exception=str(err))
+        finally:
+            self._listdir_cache = None
+            self.observers_inform(self, TransportEvent.transport_end, mode="sftp sources",
+                                  count_resources=self.count_resources, count_sitemaps=self.count_sitemaps,
+                                  count_transfers=self.count_transfers, count_errors=self.count_errors)
+
+    def __sftp_put(self, sftp, remote_dirs, remote_path, relpath, src):
+        remote_file = posixpath.join(remote_path, relpath.replace(os.sep, "/"))
+        if remote_file.startswith("~/"):
+            # sftp paths are relative to the home directory already
+            remote_file = remote_file[2:]
+        if not self.observers_confirm(self, TransportEvent.transfer_file, filename=src):
+            raise ObserverInterruptException("Process interrupted on TransportEvent.transfer_file")
+        # a missing local file raises FileNotFoundError here and is reported as not found
+        with open(src, "rb") as file:
+            try:
+                Transport.__sftp_makedirs(sftp, remote_dirs, posixpath.dirname(remote_file))
+                sftp.putfo(file, remote_file, os.fstat(file.fileno()).st_size,
+                           callback=lambda sent, size: self.observers_inform(
+                               self, TransportEvent.scp_progress, filename=relpath, size=size, sent=sent))
+            except OSError as err:
+                # paramiko raises FileNotFoundError for a missing remote path as well; that ends the transfer
+                raise OSError("Unable to send %s to %s: %s" % (src, remote_file, err)) from err
+        self.count_transfers += 1
+        # resources are streamed, so the number of files to send, and with it the percentage, is not known
+        self.observers_inform(self, TransportEvent.scp_transfer_complete,
+                              filename=relpath,
+                              count_resources=self.count_resources,
+                              count_sitemaps=self.count_sitemaps,
+                              count_transfers=self.count_transfers,
+                              percentage=None)
+
+    @staticmethod
+    def __sftp_makedirs(sftp, remote_dirs, remote_dir):
+        # remote_dirs holds the directories known to exist
+        if remote_dir in remote_dirs:
+            return
+        parent = posixpath.dirname(remote_dir)
+        if parent and parent != remote_dir:
+            Transport.__sftp_makedirs(sftp, remote_dirs, parent)
+        if remote_dir:
+            try:
+                sftp.stat(remote_dir)
+            except IOError:
+                sftp.mkdir(remote_dir)
+        remote_dirs.add(remote_dir)
+
     # files can be a single file, a directory, a list of files and/or directories.
     # mind that directories ending with a slash will transport the contents of the directory,
     # whereas directories not ending with a slash will transport the directory itself.
@@ -399,7 +675,11 @@ class Transport(ResourceAuditor):
         LOG.info("%s >>>> %s" % (files, remote_path))
         if self.sshClient is None:
             raise RuntimeError("Missing ssh client: see Transport.create_ssh_client(password).")
-        scp = SCPClient(transport=self.sshClient.get_transport(), progress=self.progress)
+        from scp import SCPClient, SCPException
+        if self.scpClient is None:
+            self.scpClient = SCPClient(transport=self.sshClient.get_transport(), buff_size=SCP_BUFFER_SIZE,
+                                       socket_timeout=SCP_SOCKET_TIMEOUT, progress=self.progress)
+        scp = self.scpClient
         preserve_times = True
         recursive = True  # Can be used both for sending a single file and a directory
         msg = "scp -P %d -r [files] %s@%s:%s" % (self.paras.exp_scp_port, self.paras.exp_scp_user,
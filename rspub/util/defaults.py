@@ -13,10 +13,13 @@ import urllib.request
 from datetime import datetime
 from functools import partial
 
+# translate windows path separators to url path separators
+URL_PATH_TRANSLATION = str.maketrans({"\\": "/"})
+
 
 def sanitize_url_path(value):
     if value:
-        value = urllib.parse.quote(value.replace("\\", "/"))
+        value = urllib.parse.quote(value.translate(URL_PATH_TRANSLATION), safe="/")
     return sanitize_string(value)
 
 